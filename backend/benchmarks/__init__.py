@@ -0,0 +1,6 @@
+"""
+성능 측정(벤치마크) 스크립트 모음
+
+backend 폴더에서 모듈 형태로 실행합니다:
+    python -m benchmarks.bench_codec
+"""
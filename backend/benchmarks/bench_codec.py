@@ -0,0 +1,87 @@
+"""
+와이어 코덱 마이크로 벤치마크
+
+/ws 엔드포인트가 실제로 주고받는 메시지 모양(연결 알림, 에코, 일반 텍스트 에코, 에러)에 대해
+코덱별로 다음을 측정합니다:
+- 프레임 크기 (바이트, 실제 전송되는 크기)
+- 메시지 하나당 처리 시간 (µs) = 타임스탬프 생성 + 인코딩 + 디코딩
+
+실행 방법 (backend 폴더에서):
+    python -m benchmarks.bench_codec
+    python -m benchmarks.bench_codec --number 200000
+"""
+
+import argparse
+import timeit
+
+from wire import CODECS
+
+
+def sample_messages(codec) -> dict:
+    """main.py의 websocket_endpoint가 만드는 메시지와 같은 모양의 샘플을 생성"""
+    return {
+        "connection": {
+            "type": "connection",
+            "message": "WebSocket 연결이 성공했습니다",
+            "timestamp": codec.timestamp(),
+            "connections": 42,
+        },
+        "echo": {
+            "echo": "Hello, World",
+            "timestamp": codec.timestamp(),
+        },
+        "plain_text": {
+            "echo": "Hello, World",
+            "timestamp": codec.timestamp(),
+            "note": "JSON 형식이 아닌 메시지입니다",
+        },
+        "error": {
+            "type": "error",
+            "code": "invalid_message",
+            "error": "message: Input should be a valid string",
+            "timestamp": codec.timestamp(),
+        },
+    }
+
+
+def frame_size(frame) -> int:
+    """프레임이 실제로 전송될 때의 크기 (텍스트 프레임은 UTF-8 인코딩 기준)"""
+    return len(frame.encode("utf-8")) if isinstance(frame, str) else len(frame)
+
+
+def bench_codec(codec, number: int) -> list:
+    """코덱 하나에 대해 메시지 모양별 결과를 반환"""
+    results = []
+    for shape, message in sample_messages(codec).items():
+        encode = codec.encode
+        decode = codec.decode
+        timestamp = codec.timestamp
+
+        def round_trip():
+            # 응답마다 타임스탬프를 새로 만드는 실제 동작을 그대로 재현
+            message["timestamp"] = timestamp()
+            decode(encode(message))
+
+        seconds = min(timeit.repeat(round_trip, number=number, repeat=3))
+        results.append({
+            "codec": codec.name,
+            "shape": shape,
+            "bytes": frame_size(encode(message)),
+            "us_per_message": seconds / number * 1e6,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="와이어 코덱 마이크로 벤치마크")
+    parser.add_argument("--number", type=int, default=50000, help="측정 반복 횟수 (기본값: 50000)")
+    args = parser.parse_args()
+
+    print(f"{'codec':<10}{'shape':<14}{'bytes':>8}{'µs/msg':>10}")
+    for codec in CODECS.values():
+        for row in bench_codec(codec, args.number):
+            print(f"{row['codec']:<10}{row['shape']:<14}{row['bytes']:>8}{row['us_per_message']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+메시지 라우터 마이크로 벤치마크
+
+/ws 수신 루프의 메시지 처리 방식 두 가지를 비교합니다 (인코딩/전송 제외, 해석 + 처리만):
+- legacy: 이전 방식 - json.loads 후 .get("message")/.get("type")을 if/elif로 분기, 그 밖의 오류는 except Exception
+- router: router.py - "type" 값으로 핸들러를 한 번에 찾고 pydantic 모델로 형식 검사 (에코는 모델 없이 딕셔너리를 그대로 읽음)
+
+메시지 모양:
+- echo: {"message": ...} (가장 흔한 메시지)
+- broadcast: {"type": "broadcast", ...} (방 참여자 0명으로 측정)
+- pong: {"type": "pong"}
+- unknown_type: 등록되지 않은 "type" (에코로 처리)
+- non_dict: JSON이지만 객체가 아님 (legacy는 AttributeError 예외, router는 모델 검사 전에 invalid_message 에러 응답)
+- bad_type: "type"이 문자열이 아님 (legacy는 에코로 처리, router는 invalid_message 에러 응답)
+- invalid: 필드 형식이 틀린 메시지 (legacy는 그대로 처리, router는 invalid_message 에러 응답)
+
+실행 방법 (backend 폴더에서):
+    python -m benchmarks.bench_router
+    python -m benchmarks.bench_router --number 200000
+"""
+
+import argparse
+import json
+import time
+
+from router import MessageContext, error_message, router
+from wire import JSON_CODEC, DecodeError
+
+# 측정할 메시지 (JSON 텍스트 프레임)
+SAMPLES = {
+    "echo": json.dumps({"message": "Hello, World"}),
+    "broadcast": json.dumps({"type": "broadcast", "message": "다음 슬라이드로 넘어갑니다"}),
+    "pong": json.dumps({"type": "pong"}),
+    "unknown_type": json.dumps({"type": "slide", "message": "Hello, World"}),
+    "non_dict": json.dumps(["Hello", "World"]),
+    "bad_type": json.dumps({"type": [1], "message": "Hello, World"}),
+    "invalid": json.dumps({"type": "broadcast", "message": {"text": "객체"}}),
+}
+
+
+class FakeConnection:
+    """벤치마크용 연결 (코덱만 있으면 됨)"""
+    codec = JSON_CODEC
+
+
+class FakeManager:
+    """벤치마크용 연결 관리자 (방 참여자가 없는 것처럼 동작)"""
+
+    def broadcast(self, room, message, exclude=None) -> int:
+        return 0
+
+
+async def legacy_handle(manager, conn, room, codec, data):
+    """router.py 도입 전 main.py의 분기 + 예외 처리 (스트리밍 분기 제외)"""
+    try:
+        message_data = codec.decode(data)
+        client_message = message_data.get("message", "")
+        message_type = message_data.get("type")
+
+        if message_type == "pong":
+            outcome = "pong"
+            response = None
+        elif message_type == "broadcast" and room:
+            delivered = manager.broadcast(room, {
+                "type": "broadcast",
+                "room": room,
+                "message": client_message
+            }, exclude=conn)
+            outcome = "broadcast"
+            response = {"type": "broadcast_ack", "delivered": delivered, "timestamp": codec.timestamp()}
+        else:
+            outcome = "echo"
+            response = {"echo": client_message, "timestamp": codec.timestamp()}
+
+    except DecodeError:
+        outcome = "non_json"
+        response = {"echo": data, "timestamp": codec.timestamp(), "note": "JSON 형식이 아닌 메시지입니다"}
+
+    except Exception as e:
+        outcome = "error"
+        response = {"error": f"메시지 처리 중 오류: {str(e)}", "timestamp": codec.timestamp()}
+    return outcome, response
+
+
+async def router_handle(ctx, codec, data):
+    """현재 main.py의 처리 방식"""
+    try:
+        message_data = codec.decode(data)
+        outcome, response = await router.dispatch(ctx, message_data)
+
+    except DecodeError:
+        outcome = "non_json"
+        response = {"echo": data, "timestamp": codec.timestamp(), "note": "JSON 형식이 아닌 메시지입니다"}
+
+    except Exception:
+        outcome = "error"
+        response = error_message(ctx, "internal_error", "서버 내부 오류가 발생했습니다")
+    return outcome, response
+
+
+def measure(handle, args: tuple, number: int) -> float:
+    """
+    handle(*args)를 number번 await하는 데 걸린 시간 중 최솟값 (µs/메시지)
+
+    수신 루프처럼 실행 중인 코루틴 안에서 await하고, 기다리는 일이 없으므로 이벤트 루프 없이 실행
+    """
+    async def repeat():
+        started = time.perf_counter()
+        for _ in range(number):
+            await handle(*args)
+        return time.perf_counter() - started
+
+    best = float("inf")
+    for _ in range(3):
+        try:
+            repeat().send(None)
+        except StopIteration as e:
+            best = min(best, e.value)
+        else:
+            raise RuntimeError("벤치마크 중에 코루틴이 실제로 기다렸습니다")
+    return best / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지 라우터 마이크로 벤치마크")
+    parser.add_argument("--number", type=int, default=50000, help="측정 반복 횟수 (기본값: 50000)")
+    args = parser.parse_args()
+
+    router.compile()
+    conn = FakeConnection()
+    manager = FakeManager()
+    room = "bench"
+    codec = JSON_CODEC
+    ctx = MessageContext(conn, manager, room=room)
+
+    print(f"{'shape':<14}{'legacy µs':>11}{'router µs':>11}{'ratio':>8}  legacy → router outcome")
+    for shape, data in SAMPLES.items():
+        legacy_args = (manager, conn, room, codec, data)
+        router_args = (ctx, codec, data)
+        legacy = measure(legacy_handle, legacy_args, args.number)
+        routed = measure(router_handle, router_args, args.number)
+        legacy_outcome = run_once(legacy_handle, legacy_args)
+        router_outcome = run_once(router_handle, router_args)
+        print(f"{shape:<14}{legacy:>11.2f}{routed:>11.2f}{routed / legacy:>8.2f}  {legacy_outcome} → {router_outcome}")
+
+
+def run_once(handle, args: tuple) -> str:
+    """한 번 실행해서 outcome만 반환"""
+    try:
+        handle(*args).send(None)
+    except StopIteration as e:
+        return e.value[0]
+
+
+if __name__ == "__main__":
+    main()
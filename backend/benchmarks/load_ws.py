@@ -0,0 +1,356 @@
+"""
+/ws 엔드포인트 부하 테스트 (동시 접속 + 왕복 지연 시간 측정)
+
+서버를 로컬에서 직접 띄운 뒤, 수천 개의 WebSocket 클라이언트를 동시에 연결하고
+정해진 비율의 메시지(정상 JSON / 일반 텍스트 / 큰 메시지)를 보내며 다음을 측정합니다:
+- 연결 속도 (connections/sec)
+- 처리량 (messages/sec)
+- 왕복 지연 시간 p50/p95/p99 (ms)
+- 서버 메모리 사용량 (RSS, Linux에서만 측정)
+
+결과는 JSON으로 저장되므로 이전 결과(--baseline)와 비교해서 성능 저하를 잡아낼 수 있습니다.
+
+응답은 종류(outcome)별로 따로 셉니다 - 에코("echo"), 거절("too_large", "rate_limited"), 에러("error") 등.
+처리량(per_sec)과 지연 시간은 에코 응답만으로 계산하므로 거절 응답이 많아도 결과가 부풀려지지 않습니다.
+직접 띄우는 서버는 기본적으로 속도 제한을 끄고 실행합니다 (--rate-limit으로 지정 가능, config.py 참고).
+
+실행 방법 (backend 폴더에서):
+    python -m benchmarks.load_ws --clients 2000 --duration 20 --output bench_output.json
+    python -m benchmarks.load_ws --mix json=8,text=1,oversized=1
+    python -m benchmarks.load_ws --baseline old.json --tolerance 0.1   # 10% 이상 나빠지면 종료 코드 1
+
+이미 실행 중인 서버를 대상으로 하려면 --url ws://호스트:포트/ws (이 경우 --server-pid로 RSS 측정 가능)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+import websockets
+
+# backend 폴더 (서버를 실행할 위치)
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# 부하 테스트에 사용하는 메시지 종류
+# - json: 정상 JSON 메시지 (에코 경로)
+# - text: JSON이 아닌 일반 텍스트 (JSONDecodeError 경로)
+# - oversized: 큰 JSON 메시지 (--oversized-bytes 크기)
+MESSAGE_KINDS = ("json", "text", "oversized")
+
+
+def parse_mix(text: str) -> dict:
+    """"json=8,text=1,oversized=1" 형태의 문자열을 {종류: 비율}로 변환"""
+    mix = {}
+    for part in text.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in MESSAGE_KINDS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 메시지 종류: {kind} (가능: {', '.join(MESSAGE_KINDS)})")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def make_payloads(oversized_bytes: int) -> dict:
+    """메시지 종류별 전송 데이터 (미리 만들어 두어 클라이언트 쪽 비용을 줄임)"""
+    return {
+        "json": json.dumps({"message": "Hello, World"}),
+        "text": "Hello, World",
+        "oversized": json.dumps({"message": "x" * oversized_bytes}),
+    }
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """정렬된 값 목록의 p 백분위수 (nearest-rank 방식)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def read_rss_mb(pid: int):
+    """프로세스의 현재 메모리 사용량(RSS, MB) - /proc가 없으면 None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def raise_fd_limit():
+    """클라이언트 수천 개를 열 수 있도록 파일 디스크립터 제한을 최대로 올림"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    """
+    backend 폴더의 main:app을 uvicorn으로 실행하고 /health가 응답할 때까지 대기
+
+    env: 서버에 추가로 넘길 환경 변수 (config.py의 설정 덮어쓰기, 예: {"RATE_LIMIT_PER_SEC": "0"})
+    """
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("서버를 시작하지 못했습니다")
+
+
+class Stats:
+    """모든 클라이언트가 공유하는 측정값"""
+
+    def __init__(self):
+        self.connect_times = []              # 연결 하나에 걸린 시간 (초)
+        self.connect_failures = 0
+        self.sent = dict.fromkeys(MESSAGE_KINDS, 0)
+        self.received = dict.fromkeys(MESSAGE_KINDS, 0)
+        self.latencies = {kind: [] for kind in MESSAGE_KINDS}  # 에코 응답의 왕복 지연 시간 (ms)
+        self.outcomes = Counter()            # 응답 종류별 개수 ("echo", "too_large", "rate_limited", "error" 등)
+        self.closed_by_server = 0            # 서버가 연결을 끊은 횟수 (예: 크기 제한)
+        self.close_codes = Counter()         # 서버가 연결을 끊을 때 보낸 종료 코드별 횟수
+
+
+def classify(frame) -> str:
+    """서버 응답의 종류 - 에코, 거절 사유(code), 에러, ping"""
+    try:
+        data = json.loads(frame)
+    except ValueError:
+        return "unparsed"
+    if not isinstance(data, dict):
+        return "unparsed"
+    if "echo" in data:
+        return "echo"
+    if data.get("type") in ("error", "ping"):
+        return data.get("code", data["type"])
+    if "error" in data:
+        return "error"
+    return "other"
+
+
+async def run_client(url, stats, payloads, kinds, weights, start_event, stop_at, connect_limit):
+    """클라이언트 하나: 연결 → 시작 신호 대기 → 메시지 전송/응답 수신 반복"""
+    async with connect_limit:
+        started = time.perf_counter()
+        try:
+            ws = await websockets.connect(url, max_size=None, open_timeout=30)
+            await ws.recv()                  # 환영 메시지
+        except Exception:
+            stats.connect_failures += 1
+            return
+        stats.connect_times.append(time.perf_counter() - started)
+
+    try:
+        await start_event.wait()
+        rng = random.Random()
+        while time.perf_counter() < stop_at[0]:
+            kind = rng.choices(kinds, weights)[0]
+            sent_at = time.perf_counter()
+            await ws.send(payloads[kind])
+            stats.sent[kind] += 1
+            outcome = classify(await ws.recv())
+            while outcome == "ping":             # 하트비트 ping은 응답이 아니므로 다음 프레임을 기다림
+                outcome = classify(await ws.recv())
+            if outcome == "echo":
+                stats.latencies[kind].append((time.perf_counter() - sent_at) * 1000)
+            stats.outcomes[outcome] += 1
+            stats.received[kind] += 1
+    except websockets.ConnectionClosed as e:
+        stats.closed_by_server += 1
+        stats.close_codes[str(e.rcvd.code if e.rcvd is not None else 1006)] += 1
+    finally:
+        await ws.close()
+
+
+async def sample_rss(pid, samples, stop_event):
+    """부하 테스트 동안 서버 RSS를 주기적으로 기록"""
+    while not stop_event.is_set():
+        rss = read_rss_mb(pid)
+        if rss is not None:
+            samples.append(rss)
+        await asyncio.sleep(0.5)
+
+
+async def run_load(args, url, server_pid) -> dict:
+    stats = Stats()
+    payloads = make_payloads(args.oversized_bytes)
+    kinds = list(args.mix)
+    weights = [args.mix[kind] for kind in kinds]
+    start_event = asyncio.Event()
+    connect_limit = asyncio.Semaphore(args.connect_concurrency)
+    rss = {"idle": read_rss_mb(server_pid) if server_pid else None}
+
+    # 1단계: 모든 클라이언트 연결 (연결 속도 측정)
+    # stop_at은 연결이 끝난 뒤 정해지므로 리스트에 담아 나중에 채움
+    stop_at = [0.0]
+    connect_started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(run_client(url, stats, payloads, kinds, weights, start_event, stop_at, connect_limit))
+        for _ in range(args.clients)
+    ]
+    while len(stats.connect_times) + stats.connect_failures < args.clients:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - connect_started
+    rss["connected"] = read_rss_mb(server_pid) if server_pid else None
+
+    # 2단계: 메시지 부하 (처리량, 지연 시간 측정)
+    samples = []
+    sampler_stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(server_pid, samples, sampler_stop)) if server_pid else None
+    load_started = time.perf_counter()
+    stop_at[0] = load_started + args.duration
+    start_event.set()
+    await asyncio.gather(*tasks)
+    load_seconds = time.perf_counter() - load_started
+    sampler_stop.set()
+    if sampler is not None:
+        await sampler
+    rss["peak"] = max(samples) if samples else None
+
+    all_latencies = sorted(v for values in stats.latencies.values() for v in values)
+    echoed = stats.outcomes["echo"]
+    return {
+        "config": {
+            "clients": args.clients,
+            "duration": args.duration,
+            "mix": args.mix,
+            "oversized_bytes": args.oversized_bytes,
+            "rate_limit": args.rate_limit if args.url is None else None,
+        },
+        "connect": {
+            "succeeded": len(stats.connect_times),
+            "failed": stats.connect_failures,
+            "seconds": round(connect_seconds, 3),
+            "per_sec": round(len(stats.connect_times) / connect_seconds, 1) if connect_seconds else 0.0,
+        },
+        "messages": {
+            "sent": stats.sent,
+            "received": stats.received,
+            "outcomes": dict(stats.outcomes),                        # 응답 종류별 개수
+            "per_sec": round(echoed / load_seconds, 1) if load_seconds else 0.0,   # 에코 응답만
+            "rejected_per_sec": round((sum(stats.outcomes.values()) - echoed) / load_seconds, 1) if load_seconds else 0.0,
+            "closed_by_server": stats.closed_by_server,
+            "close_codes": dict(stats.close_codes),
+        },
+        "latency_ms": {
+            "p50": round(percentile(all_latencies, 50), 3),
+            "p95": round(percentile(all_latencies, 95), 3),
+            "p99": round(percentile(all_latencies, 99), 3),
+            "max": round(all_latencies[-1], 3) if all_latencies else 0.0,
+            "by_kind": {
+                kind: {
+                    "p50": round(percentile(values, 50), 3),
+                    "p99": round(percentile(values, 99), 3),
+                }
+                for kind, values in ((k, sorted(v)) for k, v in stats.latencies.items())
+                if values
+            },
+        },
+        "server_rss_mb": rss,
+    }
+
+
+# 성능 저하 판정 기준: (결과 경로, 값이 클수록 좋은지)
+REGRESSION_CHECKS = (
+    (("connect", "per_sec"), True),
+    (("messages", "per_sec"), True),
+    (("latency_ms", "p50"), False),
+    (("latency_ms", "p95"), False),
+    (("latency_ms", "p99"), False),
+)
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """기준 결과보다 tolerance(비율) 이상 나빠진 항목 목록을 반환"""
+    regressions = []
+    for path, higher_is_better in REGRESSION_CHECKS:
+        current, previous = result, baseline
+        for key in path:
+            current, previous = current[key], previous[key]
+        if not previous:
+            continue
+        change = (current - previous) / previous
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{'.'.join(path)}: {previous} → {current} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/ws 엔드포인트 부하 테스트")
+    parser.add_argument("--clients", type=int, default=1000, help="동시 접속 클라이언트 수 (기본값: 1000)")
+    parser.add_argument("--duration", type=float, default=10.0, help="메시지 부하 시간(초) (기본값: 10)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("json=8,text=1,oversized=1"),
+                        help="메시지 종류별 비율 (기본값: json=8,text=1,oversized=1)")
+    parser.add_argument("--oversized-bytes", type=int, default=256 * 1024, help="큰 메시지 크기 (기본값: 256KiB)")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="동시에 진행할 연결 시도 수 (기본값: 200)")
+    parser.add_argument("--rate-limit", type=float, default=0,
+                        help="직접 띄우는 서버의 연결별 초당 메시지 제한 (기본값: 0 = 제한 없음, config.RATE_LIMIT_PER_SEC)")
+    parser.add_argument("--url", help="이미 실행 중인 서버의 WebSocket 주소 (지정하지 않으면 서버를 직접 실행)")
+    parser.add_argument("--server-pid", type=int, help="--url 사용 시 RSS를 측정할 서버 프로세스 ID")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로 (지정하지 않으면 화면에만 출력)")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="허용할 성능 저하 비율 (기본값: 0.1 = 10%%)")
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if url is None:
+        port = free_port()
+        server = start_server(port, {"RATE_LIMIT_PER_SEC": str(args.rate_limit)})
+        url, server_pid = f"ws://127.0.0.1:{port}/ws", server.pid
+
+    try:
+        result = asyncio.run(run_load(args, url, server_pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"성능 저하: {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+워커 프로세스 간 메시지 버스
+
+서버를 여러 프로세스(워커)로 실행하면 각 워커는 자기에게 연결된 클라이언트만 알고 있습니다.
+이 모듈은 워커들을 하나의 허브(hub)로 연결해서 다음을 공유합니다:
+1. 브로드캐스트 - 한 워커에서 보낸 방(room) 메시지를 다른 워커의 클라이언트에게도 전달
+2. 접속 현황 - 워커별 연결 수와 방 참여자 수 (/health, 환영 메시지의 연결 수에 사용)
+
+구성:
+- UnixSocketBus + run_hub: 실제 멀티 워커 환경용 (Unix 도메인 소켓, Linux/macOS)
+- LocalBus + LocalHub: 한 프로세스 안에서 동작하는 대체 구현 (단일 워커 실행, 테스트용)
+
+허브와 주고받는 프레임 (딕셔너리):
+    {"op": "publish", "room": 방이름, "message": 메시지}
+    {"op": "presence", "worker": 워커ID, "connections": 연결 수, "rooms": {방이름: 참여자 수}}
+    {"op": "gone", "worker": 워커ID}
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import struct
+from abc import ABC, abstractmethod
+
+# 프레임 길이 헤더 (4바이트, 빅엔디언 부호 없는 정수)
+_HEADER = struct.Struct(">I")
+
+# 허브 연결이 끊겼을 때 재연결을 시도하는 간격 (초)
+RECONNECT_INTERVAL = 1.0
+
+# 허브가 워커 하나에게 보내지 못하고 쌓아 둘 수 있는 데이터 크기 (바이트)
+# 넘으면 그 워커에게 가는 브로드캐스트는 버리고, 4배를 넘으면 연결을 끊음 (워커가 재연결해서 현황을 다시 받음)
+HUB_MAX_BUFFER_BYTES = 1024 * 1024
+
+
+def encode_frame(frame: dict) -> bytes:
+    """프레임을 [길이 4바이트][JSON] 형태의 바이트로 변환"""
+    body = json.dumps(frame, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> dict:
+    """스트림에서 프레임 하나를 읽음 (연결이 끊기면 asyncio.IncompleteReadError)"""
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return json.loads(await reader.readexactly(length))
+
+
+def merge_presence(table: dict, frame: dict):
+    """presence 프레임(변경분)을 워커별 현황 표(워커ID → 현황)에 반영"""
+    state = table.setdefault(frame["worker"], {"connections": 0, "rooms": {}})
+    state["connections"] = frame["connections"]
+    rooms = state["rooms"]
+    for room, size in frame["rooms"].items():
+        if size:
+            rooms[room] = size
+        else:
+            rooms.pop(room, None)
+
+
+class _HubState:
+    """허브 공통 로직: 워커별 접속 현황을 보관하고 새 워커에게 전달할 스냅샷을 만듦"""
+
+    def __init__(self):
+        self.presence = {}                   # 워커ID → {"connections": n, "rooms": {방이름: n}}
+
+    def merge(self, frame: dict):
+        merge_presence(self.presence, frame)
+
+    def snapshot(self) -> list:
+        """현재 모든 워커의 현황을 presence 프레임 목록으로 반환"""
+        return [
+            {"op": "presence", "worker": worker, "connections": state["connections"], "rooms": dict(state["rooms"])}
+            for worker, state in self.presence.items()
+        ]
+
+
+class _BusPeer(ABC):
+    """
+    워커 쪽 버스 공통 로직 (하위 클래스는 _emit()을 구현해야 함)
+
+    - publish(): 다른 워커들에게 방 메시지 전달
+    - update_presence(): 이 워커의 접속 현황 변경을 알림
+      (같은 이벤트 루프 반복 안에서 생긴 변경은 하나의 프레임으로 모아서 전송)
+    - remote_connections(), remote_room_size(): 다른 워커들의 접속 현황 조회
+    """
+
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self.remote = {}                     # 다른 워커ID → {"connections": n, "rooms": {방이름: n}}
+        self._handler = None                 # 다른 워커에서 온 방 메시지를 처리할 함수 (room, message)
+        self._connections = 0                # 이 워커의 연결 수
+        self._rooms = {}                     # 이 워커의 방별 참여자 수
+        self._dirty_rooms = set()            # 아직 알리지 않은 방 변경분
+        self._dirty = False
+
+    async def start(self, handler):
+        """버스 사용 시작 - handler(room, message)는 다른 워커에서 온 브로드캐스트를 처리"""
+        self._handler = handler
+
+    async def close(self):
+        """버스 사용 종료"""
+
+    def publish(self, room: str, message: dict):
+        """다른 워커들에게 방 메시지 전달"""
+        self._emit({"op": "publish", "room": room, "message": message})
+
+    def update_presence(self, connections: int, room: str = None, room_size: int = 0):
+        """이 워커의 연결 수(및 변경된 방의 참여자 수)를 갱신"""
+        self._connections = connections
+        if room is not None:
+            if room_size:
+                self._rooms[room] = room_size
+            else:
+                self._rooms.pop(room, None)
+            self._dirty_rooms.add(room)
+        if not self._dirty:
+            self._dirty = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def remote_connections(self) -> int:
+        """다른 워커들의 연결 수 합계"""
+        return sum(state["connections"] for state in self.remote.values())
+
+    def remote_room_size(self, room: str) -> int:
+        """다른 워커들에서 해당 방에 참여 중인 연결 수 합계"""
+        return sum(state["rooms"].get(room, 0) for state in self.remote.values())
+
+    def _flush(self):
+        """모아 둔 접속 현황 변경분을 한 번에 전송"""
+        self._dirty = False
+        rooms = {room: self._rooms.get(room, 0) for room in self._dirty_rooms}
+        self._dirty_rooms.clear()
+        self._emit({"op": "presence", "worker": self.worker_id, "connections": self._connections, "rooms": rooms})
+
+    def _full_presence(self) -> dict:
+        """이 워커의 전체 접속 현황 (허브에 새로 연결했을 때 전송)"""
+        return {"op": "presence", "worker": self.worker_id, "connections": self._connections, "rooms": dict(self._rooms)}
+
+    def _receive(self, frame: dict):
+        """허브에서 받은 프레임 처리"""
+        op = frame["op"]
+        if op == "publish":
+            if self._handler is not None:
+                self._handler(frame["room"], frame["message"])
+        elif op == "presence":
+            if frame["worker"] != self.worker_id:
+                merge_presence(self.remote, frame)
+        elif op == "gone":
+            self.remote.pop(frame["worker"], None)
+
+    @abstractmethod
+    def _emit(self, frame: dict):
+        """프레임을 허브로 전송 (전송 방식은 하위 클래스에서 구현)"""
+
+
+# ============== 프로세스 내부 버스 (단일 워커 / 테스트용) ==============
+
+class LocalHub(_HubState):
+    """
+    한 프로세스 안에서 여러 LocalBus를 연결하는 허브
+
+    테스트 예:
+        hub = LocalHub()
+        manager_a = ConnectionManager(bus=LocalBus(hub))
+        manager_b = ConnectionManager(bus=LocalBus(hub))
+        # manager_a의 브로드캐스트가 manager_b의 클라이언트에게도 전달됨
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.peers = []
+
+    def attach(self, peer: "LocalBus"):
+        for frame in self.snapshot():
+            peer._receive(frame)
+        self.peers.append(peer)
+
+    def detach(self, peer: "LocalBus"):
+        if peer in self.peers:
+            self.peers.remove(peer)
+            self.presence.pop(peer.worker_id, None)
+            self.relay(peer, {"op": "gone", "worker": peer.worker_id})
+
+    def relay(self, sender: "LocalBus", frame: dict):
+        """보낸 워커를 제외한 모든 워커에게 프레임 전달"""
+        if frame["op"] == "presence":
+            self.merge(frame)
+        for peer in self.peers:
+            if peer is not sender:
+                peer._receive(frame)
+
+
+class LocalBus(_BusPeer):
+    """프로세스 내부 버스 - hub를 지정하지 않으면 다른 워커가 없는 단일 워커로 동작"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, hub: LocalHub = None):
+        super().__init__(f"local-{next(self._ids)}")
+        self.hub = hub if hub is not None else LocalHub()
+
+    async def start(self, handler):
+        await super().start(handler)
+        self.hub.attach(self)
+
+    async def close(self):
+        self.hub.detach(self)
+
+    def _emit(self, frame: dict):
+        self.hub.relay(self, frame)
+
+
+# ============== Unix 도메인 소켓 버스 (멀티 워커용) ==============
+
+class UnixSocketBus(_BusPeer):
+    """
+    Unix 도메인 소켓으로 허브(run_hub)에 연결하는 버스
+
+    - 워커ID는 프로세스 ID
+    - 허브 연결이 끊기면 다른 워커 현황을 비우고 주기적으로 재연결
+    """
+
+    def __init__(self, path: str):
+        super().__init__(str(os.getpid()))
+        self.path = path
+        self._writer = None
+        self._task = None
+
+    async def start(self, handler):
+        await super().start(handler)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    def _emit(self, frame: dict):
+        # 허브에 연결되지 않은 동안의 브로드캐스트는 버림 (접속 현황은 재연결 시 전체를 다시 보냄)
+        if self._writer is not None:
+            self._writer.write(encode_frame(frame))
+
+    async def _run(self):
+        """허브에 연결하고 프레임을 받아 처리 (끊기면 재연결)"""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError:
+                await asyncio.sleep(RECONNECT_INTERVAL)
+                continue
+            self._writer = writer
+            writer.write(encode_frame(self._full_presence()))
+            try:
+                while True:
+                    self._receive(await read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                self._writer = None
+                self.remote.clear()
+                writer.close()
+            await asyncio.sleep(RECONNECT_INTERVAL)
+
+
+async def serve_hub(path: str):
+    """허브 서버 - 워커들이 보낸 프레임을 다른 모든 워커에게 중계"""
+    state = _HubState()
+    writers = {}                             # StreamWriter → 워커ID
+
+    def relay(sender, frame: dict):
+        """
+        보낸 워커를 제외한 모든 워커에게 프레임 전달 (기다리지 않음)
+
+        느린 워커 하나 때문에 허브의 송신 버퍼가 끝없이 커지지 않도록,
+        받아 가지 못한 데이터가 많은 워커에게는 브로드캐스트를 버리고 너무 많으면 연결을 끊음
+        """
+        data = encode_frame(frame)
+        for writer in list(writers):
+            if writer is sender:
+                continue
+            pending = writer.transport.get_write_buffer_size()
+            if pending > HUB_MAX_BUFFER_BYTES * 4:
+                writer.close()                   # handle_worker가 정리함
+            elif pending <= HUB_MAX_BUFFER_BYTES or frame["op"] != "publish":
+                writer.write(data)
+
+    async def handle_worker(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # 새 워커에게 기존 워커들의 현황부터 전달
+        for frame in state.snapshot():
+            writer.write(encode_frame(frame))
+        writers[writer] = None
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame["op"] == "presence":
+                    writers[writer] = frame["worker"]
+                    state.merge(frame)
+                relay(writer, frame)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            worker = writers.pop(writer, None)
+            writer.close()
+            if worker is not None:
+                state.presence.pop(worker, None)
+                relay(None, {"op": "gone", "worker": worker})
+
+    # 이전 실행에서 남은 소켓 파일 정리
+    if os.path.exists(path):
+        os.unlink(path)
+    server = await asyncio.start_unix_server(handle_worker, path=path)
+    async with server:
+        await server.serve_forever()
+
+
+def run_hub(path: str):
+    """허브 서버를 실행 (별도 프로세스의 진입점으로 사용)"""
+    try:
+        asyncio.run(serve_hub(path))
+    except KeyboardInterrupt:
+        pass
@@ -8,6 +8,8 @@
 3. 코드의 가독성이 향상됨
 """
 
+import os
+
 # ============== 서버 기본 설정 ==============
 
 # 서버가 바인딩될 IP 주소
@@ -25,6 +27,16 @@ PORT = 8000
 # False: 수동으로 서버를 재시작해야 함 (프로덕션에서는 False 권장)
 RELOAD = True
 
+# 워커 프로세스 수
+# 1: 프로세스 하나로 실행 (개발 모드, 기본값)
+# 2 이상: 프로덕션 모드 - 여러 프로세스로 실행해서 CPU 코어를 여러 개 사용
+#         (RELOAD 설정은 무시됨, Linux/macOS에서만 지원)
+#         워커들은 아래 BUS_SOCKET_PATH의 허브로 브로드캐스트와 연결 수를 공유함
+WORKERS = 1
+
+# 워커 프로세스들이 메시지를 주고받는 Unix 도메인 소켓 파일 경로 (WORKERS가 2 이상일 때만 사용)
+BUS_SOCKET_PATH = "/tmp/presentation-angel-bus.sock"
+
 # ============== CORS (Cross-Origin Resource Sharing) 설정 ==============
 
 # 브라우저의 보안 정책상, 웹페이지가 다른 도메인의 서버에 요청을 보내는 것이 제한됨
@@ -50,4 +62,107 @@ ALLOWED_ORIGINS = [
 # "info": 일반적인 정보 출력 (기본값)
 # "warning": 경고 이상만 출력
 # "error": 에러만 출력
-LOG_LEVEL = "info" 
\ No newline at end of file
+LOG_LEVEL = "info"
+
+# 메시지마다 남기는 로그(debug 레벨)의 샘플링 비율
+# 1.0: 모든 메시지 기록, 0.01: 100개 중 1개 정도만 기록
+# 메시지가 많을 때 로그 출력이 성능을 떨어뜨리지 않도록 낮게 유지
+LOG_SAMPLE_RATE = 0.01
+
+# 출력을 기다리는 로그의 최대 개수
+# 로그 출력이 밀려서 이 개수를 넘으면 새 로그는 버려짐 (서버가 느려지는 것보다 나음)
+LOG_QUEUE_SIZE = 10000
+
+# ============== WebSocket 연결 관리 설정 ==============
+
+# 연결마다 가지는 송신 큐의 최대 크기 (메시지 개수)
+# 클라이언트가 메시지를 받는 속도보다 서버가 보내는 속도가 빠르면 큐에 쌓임
+SEND_QUEUE_SIZE = 256
+
+# 송신 큐가 가득 찬 느린 클라이언트 처리 방법
+# "drop_oldest": 가장 오래된 메시지를 버림 (연결은 유지)
+# "disconnect": 연결을 끊음
+SLOW_CONSUMER_POLICY = "drop_oldest"
+
+# ============== 수신 제한 설정 (클라이언트 하나가 서버를 독차지하지 못하게 함) ==============
+
+# 이 항목의 값들은 같은 이름의 환경 변수로 바꿀 수 있음 (부하 테스트 등에서 사용)
+# 예: RATE_LIMIT_PER_SEC=0 python main.py
+
+# 메시지 최대 크기 (텍스트는 문자 수, 바이너리는 바이트 수)
+# 이보다 큰 메시지는 해석하지 않고 {"code": "too_large"} 응답을 보냄
+MAX_FRAME_BYTES = int(os.environ.get("MAX_FRAME_BYTES", 64 * 1024))
+
+# WebSocket 프로토콜 수준의 메시지 최대 크기 (바이트)
+# 이보다 큰 메시지는 서버(uvicorn)가 받는 즉시 연결을 끊음 (종료 코드 1009)
+WS_MAX_SIZE = 1024 * 1024
+
+# 연결별 속도 제한 (토큰 버킷)
+# 초당 RATE_LIMIT_PER_SEC개까지 처리, 순간적으로는 RATE_LIMIT_BURST개까지 허용
+# 넘치는 메시지는 {"code": "rate_limited"} 응답을 보냄
+# RATE_LIMIT_PER_SEC를 0으로 설정하면 속도 제한을 하지 않음
+RATE_LIMIT_PER_SEC = float(os.environ.get("RATE_LIMIT_PER_SEC", 50))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", 100))
+
+# 연속으로 이 횟수만큼 거절되면 연결을 끊음 (종료 코드 1008)
+RATE_LIMIT_MAX_STRIKES = int(os.environ.get("RATE_LIMIT_MAX_STRIKES", 50))
+
+# 아직 보내지 못한 응답의 최대 개수
+# 이만큼 쌓이면 클라이언트가 응답을 받아갈 때까지 새 메시지를 읽지 않음 (배압)
+MAX_PENDING_SENDS = 64
+
+# ============== 하트비트 / 유휴 연결 정리 설정 ==============
+
+# 클라이언트가 이 시간(초) 동안 아무 메시지도 보내지 않으면 {"type": "ping"}을 보냄
+# 클라이언트는 {"type": "pong"}으로 응답해야 함 - 받기만 하는 클라이언트(청중 화면 등)도 응답하지 않으면
+# IDLE_TIMEOUT 뒤에 끊기므로 프론트엔드에 ping 처리가 필요함 (API_DOCS_FOR_FRONTEND.md의 "하트비트")
+HEARTBEAT_INTERVAL = 25
+
+# 클라이언트가 이 시간(초) 동안 아무 메시지도 보내지 않으면 연결을 끊음 (종료 코드 1001)
+# 0으로 설정하면 유휴 연결 정리를 하지 않음
+IDLE_TIMEOUT = 60
+
+# 유휴 연결을 확인하는 간격(초) - 타이머 휠 한 칸의 시간
+# 연결이 끊기는 시각은 최대 이 시간만큼 늦어질 수 있음
+HEARTBEAT_TICK = 1.0
+
+# ============== 세션 이어받기 설정 (재연결 시 놓친 메시지 다시 보내기) ==============
+
+# 연결이 끊긴 세션을 보관하는 시간(초) - 이 시간 안에 다시 연결하면 놓친 메시지를 받을 수 있음
+# 0으로 설정하면 세션을 사용하지 않음 (메시지에 순번("seq")도 붙지 않음)
+SESSION_TTL = 30
+
+# 세션마다 보관하는 최근 메시지 수
+SESSION_REPLAY_MESSAGES = 256
+
+# 모든 세션이 보관하는 메시지 크기 합계 한도 (바이트, 텍스트 메시지는 문자 수)
+# 넘으면 연결이 끊긴 지 오래된 세션부터 삭제
+SESSION_MEMORY_BYTES = 32 * 1024 * 1024
+
+# ============== 스트리밍 분석 설정 (ws://.../ws?mode=stream) ==============
+
+# 분석을 실행할 프로세스 수 (CPU 코어 수 이하 권장)
+INGEST_PROCESSES = 2
+
+# 동시에 분석 중일 수 있는 윈도우 수 (모든 연결 합계)
+# 이만큼 쌓이면 스트리밍 클라이언트의 데이터를 잠시 읽지 않음 (배압)
+INGEST_MAX_INFLIGHT = 8
+
+# 기본 분석 단계 (쉼표로 구분, ingest.py의 STAGES 참고)
+INGEST_DEFAULT_STAGES = "audio_level"
+
+# 분석 윈도우 크기 (바이트) - 기본값은 16kHz 16비트 모노 오디오 1초 분량
+INGEST_WINDOW_BYTES = 32000
+
+# 클라이언트가 지정할 수 있는 가장 작은 윈도우 크기 (바이트)
+INGEST_MIN_WINDOW_BYTES = 1024
+
+# 연결별 링 버퍼 크기 (바이트) - 윈도우 크기의 최댓값이기도 함
+# 윈도우 + MAX_FRAME_BYTES보다 작으면 그 크기로 늘려서 만듦 (남은 데이터 + 가장 큰 조각이 들어갈 공간)
+INGEST_BUFFER_BYTES = 256 * 1024
+
+# 스트리밍 데이터 조각의 연결별 속도 제한 (초당 바이트 수, 토큰 버킷)
+# 데이터 조각은 메시지 개수 제한(RATE_LIMIT_PER_SEC) 대신 이 제한을 받음 - 10ms 단위 오디오 조각도 보낼 수 있음
+# 기본값은 16kHz 16비트 모노 오디오(초당 32000바이트)의 4배, 0으로 설정하면 제한 없음
+INGEST_BYTES_PER_SEC = float(os.environ.get("INGEST_BYTES_PER_SEC", 128 * 1024))
+INGEST_BURST_BYTES = float(os.environ.get("INGEST_BURST_BYTES", 512 * 1024))
@@ -0,0 +1,359 @@
+"""
+WebSocket 연결 관리자
+
+main.py의 active_connections 리스트를 대체하는 모듈입니다.
+
+주요 기능:
+1. 연결 등록/해제를 O(1)로 처리 (리스트 대신 딕셔너리/집합 사용)
+2. 방(room) 단위 관리 - 예: 발표자 1명 → 청중 여러 명
+3. 브로드캐스트 - 메시지를 한 번만 직렬화하고 같은 데이터를 모든 구독자에게 동시에 전송
+4. 연결마다 크기가 제한된 송신 큐 - 느린 클라이언트 하나가 방 전체를 막지 못하게 함
+5. 연결마다 와이어 코덱(JSON/MessagePack)을 가짐 - wire.py 참고
+6. 메시지 버스로 다른 워커 프로세스와 브로드캐스트/접속 현황 공유 - bus.py 참고
+7. 하트비트와 유휴 연결 정리 - heartbeat.py 참고
+8. 세션 이어받기 - 보내는 메시지에 순번을 붙이고 재연결 시 놓친 메시지를 다시 보냄 (sessions.py 참고)
+"""
+
+import asyncio
+import itertools
+from collections import deque
+
+from fastapi import WebSocket
+
+from bus import LocalBus
+from heartbeat import Heartbeat
+from sessions import SessionStore
+from wire import JSON_CODEC
+
+# 느린 클라이언트(송신 큐가 가득 찬 경우) 처리 정책
+# "drop_oldest": 큐에서 가장 오래된 메시지를 버리고 새 메시지를 넣음
+# "disconnect": 해당 클라이언트의 연결을 끊음
+SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+
+# 느린 클라이언트를 끊을 때 사용하는 WebSocket 종료 코드 (1008: 정책 위반)
+SLOW_CONSUMER_CLOSE_CODE = 1008
+
+
+class Connection:
+    """
+    WebSocket 연결 하나를 표현하는 클래스
+
+    - 전송할 메시지는 바로 보내지 않고 송신 큐에 넣음
+    - 연결마다 하나씩 있는 송신 태스크가 큐에서 꺼내 실제로 전송
+    - 따라서 브로드캐스트하는 쪽은 전송이 끝날 때까지 기다리지 않음
+    """
+
+    __slots__ = ("id", "websocket", "codec", "rooms", "queue", "dropped", "closed", "last_seen", "session",
+                 "_policy", "_sender", "_drain_waiter", "_drain_limit", "_held", "_held_limit")
+
+    def __init__(self, conn_id: int, websocket: WebSocket, codec, queue_size: int, policy: str):
+        self.id = conn_id
+        self.websocket = websocket
+        self.codec = codec                                   # 이 연결의 메시지 형식 (JSON/MessagePack)
+        self.rooms = set()                                   # 이 연결이 참여 중인 방 이름들
+        self.queue = asyncio.Queue(maxsize=queue_size)       # 크기가 제한된 송신 큐
+        self.dropped = 0                                     # 큐가 가득 차서 버린 메시지 수
+        self.closed = False
+        self.last_seen = 0.0                                 # 마지막으로 메시지를 받은 시각 (time.monotonic)
+        self.session = None                                  # 세션 이어받기용 세션 (sessions.py, 사용하지 않으면 None)
+        self._policy = policy
+        self._drain_waiter = None                            # wait_drained()가 기다리는 Future
+        self._drain_limit = 0
+        self._held = None                                    # replay() 중에 새로 보내진 프레임 (순서 유지용)
+        self._held_limit = 0
+        self._sender = asyncio.get_running_loop().create_task(self._send_loop())
+
+    def send(self, frame, replay: bool = True) -> bool:
+        """
+        전송할 프레임(str 또는 bytes)을 송신 큐에 넣음 (기다리지 않음)
+
+        - 세션이 있으면 순번("seq")을 붙이고 재연결 시 다시 보낼 수 있도록 보관
+          (연결이 이미 닫혔어도 보관하므로 끊긴 뒤에 도착한 응답도 재연결하면 받을 수 있음)
+        - 세션을 다른 연결이 이어받았으면 순번을 붙인 프레임을 그 연결로 전달 (순번이 빠지지 않도록)
+        - replay=False: 순번을 붙이지 않고 보관하지도 않음 (환영 메시지, ping 등 연결마다 새로 보내는 메시지)
+
+        반환값: 큐에 들어갔으면 True, 버려졌거나 연결이 닫혔으면 False
+        """
+        session = self.session
+        if replay and session is not None:
+            frame = session.record(frame)
+            current = session.conn
+            if current is not None and current is not self:
+                return current._send_live(frame)
+            return self._send_live(frame)
+        return self._put(frame)
+
+    def _send_live(self, frame) -> bool:
+        """순번이 붙은 프레임 전송 - 놓친 메시지를 다시 보내는 중이면 순서가 바뀌지 않도록 그 뒤로 미룸"""
+        held = self._held
+        if held is None or self.closed:
+            return self._put(frame)
+        held.append(frame)
+        if len(held) <= self._held_limit:
+            return True
+        # 다시 보내기가 끝나지 않는 동안 쌓인 메시지가 너무 많음 = 느린 클라이언트
+        self.dropped += 1
+        if self._policy == "disconnect":
+            self.close(SLOW_CONSUMER_CLOSE_CODE)
+            return False
+        held.popleft()
+        return True
+
+    async def replay(self, frames: list, limit: int):
+        """
+        놓친 메시지(순번이 붙은 프레임)를 다시 보냄 - 송신 큐 길이가 limit 미만일 때만 넣음 (배압)
+
+        다시 보내는 동안 새로 보내진 메시지(브로드캐스트, 이전 연결의 늦은 응답)는 그 뒤에 보냄
+        - 순번이 큰 메시지가 먼저 도착하면 클라이언트가 마지막 순번을 잘못 기억해서
+          다음 재연결 때 아직 받지 못한 메시지를 잃게 됨
+        """
+        held = self._held = deque(frames)
+        self._held_limit = len(held) + self.queue.maxsize
+        try:
+            while held and not self.closed:
+                if self.queue.qsize() >= limit:
+                    await self.wait_drained(limit)
+                    continue
+                self._put(held.popleft())
+        finally:
+            self._held = None
+
+    def _put(self, frame) -> bool:
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        # 큐가 가득 참 = 느린 클라이언트
+        self.dropped += 1
+        if self._policy == "disconnect":
+            self.close(SLOW_CONSUMER_CLOSE_CODE)
+            return False
+
+        # "drop_oldest": 가장 오래된 메시지를 버리고 새 메시지를 넣음
+        self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+        return True
+
+    def send_message(self, message: dict, replay: bool = True) -> bool:
+        """메시지(딕셔너리)를 이 연결의 코덱으로 인코딩해서 송신 큐에 넣음"""
+        return self.send(self.codec.encode(message), replay)
+
+    async def wait_drained(self, limit: int):
+        """
+        송신 큐 길이가 limit 미만이 될 때까지 대기
+
+        수신 루프가 이 함수에서 기다리는 동안에는 클라이언트 메시지를 읽지 않으므로,
+        응답을 제때 받아가지 않는 클라이언트에게 자연스럽게 배압(backpressure)이 걸림
+        """
+        while self.queue.qsize() >= limit and not self.closed:
+            self._drain_limit = limit
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            await self._drain_waiter
+
+    def _wake_drain_waiter(self):
+        waiter = self._drain_waiter
+        if waiter is not None:
+            self._drain_waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def close(self, code: int = 1000, reason: str = None):
+        """
+        송신을 중단하고 WebSocket 연결을 닫음 (여러 번 호출해도 안전)
+
+        반환값: 연결 종료 태스크 (이미 닫혀 있으면 None)
+        - 수신 루프에서 호출했다면 이 태스크를 await한 뒤에 루프를 빠져나가야 종료 코드가 전달됨
+        """
+        if self.closed:
+            return None
+        self.closed = True
+        self._sender.cancel()
+        self._wake_drain_waiter()
+        return asyncio.get_running_loop().create_task(self._close_socket(code, reason))
+
+    async def _close_socket(self, code: int, reason: str = None):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            # 이미 끊어진 연결이면 무시
+            pass
+
+    async def _send_loop(self):
+        """송신 큐에서 프레임을 꺼내 순서대로 전송하는 태스크"""
+        websocket = self.websocket
+        queue = self.queue
+        try:
+            while True:
+                frame = await queue.get()
+                if self._drain_waiter is not None and queue.qsize() < self._drain_limit:
+                    self._wake_drain_waiter()
+                if isinstance(frame, bytes):
+                    await websocket.send_bytes(frame)
+                else:
+                    await websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 전송 실패 = 클라이언트가 이미 끊어짐
+            # 연결 해제 처리는 수신 루프(websocket_endpoint)에서 담당
+            self.closed = True
+            self._wake_drain_waiter()
+
+
+class ConnectionManager:
+    """
+    모든 WebSocket 연결과 방(room)을 관리하는 클래스
+
+    사용 예:
+        manager = ConnectionManager()
+        conn = manager.register(websocket)
+        manager.join(conn, "room-1")
+        manager.broadcast("room-1", {"type": "broadcast", "message": "안녕하세요"})
+        manager.unregister(conn)
+
+    len(manager)는 이 프로세스의 연결 수, manager.total_connections()는 모든 워커의 연결 수
+    """
+
+    def __init__(self, queue_size: int = 256, slow_consumer_policy: str = "drop_oldest", bus=None,
+                 heartbeat_interval: float = 0, idle_timeout: float = 0, heartbeat_tick: float = 1.0,
+                 session_ttl: float = 0, session_replay_messages: int = 256, session_memory_bytes: int = 32 * 1024 * 1024):
+        if slow_consumer_policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"알 수 없는 느린 클라이언트 정책: {slow_consumer_policy}")
+        self.queue_size = queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.bus = bus if bus is not None else LocalBus()  # 다른 워커와 연결하는 메시지 버스
+        # 유휴 연결 정리 (idle_timeout이 0이면 사용하지 않음)
+        self.heartbeat = (
+            Heartbeat(self, heartbeat_interval or idle_timeout, idle_timeout, heartbeat_tick)
+            if idle_timeout > 0 else None
+        )
+        # 세션 이어받기 (session_ttl이 0이면 사용하지 않음)
+        self.sessions = (
+            SessionStore(session_ttl, session_replay_messages, session_memory_bytes)
+            if session_ttl > 0 else None
+        )
+        self.connections = {}                # 연결 ID → Connection
+        self.rooms = {}                      # 방 이름 → Connection 집합
+        self._ids = itertools.count(1)       # 연결 ID 발급기
+
+    def __len__(self) -> int:
+        """이 프로세스의 현재 연결 수"""
+        return len(self.connections)
+
+    async def start(self):
+        """메시지 버스 연결, 유휴 연결 정리 시작 (서버 시작 시 호출)"""
+        await self.bus.start(self.deliver)
+        if self.heartbeat is not None:
+            self.heartbeat.start()
+
+    async def stop(self):
+        """메시지 버스 연결, 유휴 연결 정리 종료 (서버 종료 시 호출)"""
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+        await self.bus.close()
+
+    def total_connections(self) -> int:
+        """모든 워커 프로세스의 연결 수 합계"""
+        return len(self.connections) + self.bus.remote_connections()
+
+    def register(self, websocket: WebSocket, codec=JSON_CODEC) -> Connection:
+        """수락(accept)된 WebSocket을 등록하고 Connection을 반환 - O(1)"""
+        conn = Connection(next(self._ids), websocket, codec, self.queue_size, self.slow_consumer_policy)
+        self.connections[conn.id] = conn
+        if self.heartbeat is not None:
+            self.heartbeat.track(conn)
+        self.bus.update_presence(len(self.connections))
+        return conn
+
+    def unregister(self, conn: Connection):
+        """
+        연결을 등록 해제 - O(참여 중인 방 수)
+
+        연결이 어떤 이유로 끝났든(정상 종료, 예외 등) 호출해야 하며,
+        여러 번 호출해도 안전함
+        """
+        if self.connections.pop(conn.id, None) is None:
+            return
+        if self.heartbeat is not None:
+            self.heartbeat.forget(conn)
+        if self.sessions is not None:
+            self.sessions.detach(conn)
+        for room in conn.rooms:
+            members = self.rooms.get(room)
+            if members is not None:
+                members.discard(conn)
+                if not members:
+                    del self.rooms[room]
+            self.bus.update_presence(len(self.connections), room, self._local_room_size(room))
+        if not conn.rooms:
+            self.bus.update_presence(len(self.connections))
+        conn.rooms.clear()
+        conn.closed = True
+        conn._sender.cancel()
+        conn._wake_drain_waiter()
+
+    def join(self, conn: Connection, room: str):
+        """연결을 방에 참여시킴"""
+        members = self.rooms.setdefault(room, set())
+        members.add(conn)
+        conn.rooms.add(room)
+        self.bus.update_presence(len(self.connections), room, len(members))
+
+    def leave(self, conn: Connection, room: str):
+        """연결을 방에서 나가게 함"""
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(conn)
+            if not members:
+                del self.rooms[room]
+        conn.rooms.discard(room)
+        self.bus.update_presence(len(self.connections), room, self._local_room_size(room))
+
+    def room_size(self, room: str) -> int:
+        """모든 워커 프로세스에서 방에 참여 중인 연결 수"""
+        return self._local_room_size(room) + self.bus.remote_room_size(room)
+
+    def _local_room_size(self, room: str) -> int:
+        return len(self.rooms.get(room, ()))
+
+    def broadcast(self, room: str, message: dict, exclude: Connection = None) -> int:
+        """
+        방의 모든 연결(다른 워커 프로세스의 연결 포함)에 메시지 전송
+
+        - 메시지는 코덱별로 딱 한 번만 직렬화되고, 같은 데이터가 모든 송신 큐에 들어감
+        - "timestamp"는 코덱 형식에 맞게 자동으로 추가됨 (JSON: ISO 문자열, MessagePack: epoch 밀리초)
+        - 실제 전송은 각 연결의 송신 태스크가 동시에 처리하므로 여기서는 기다리지 않음
+        - exclude: 제외할 연결 (보통 메시지를 보낸 사람)
+
+        반환값: 메시지를 받는 연결 수 (이 프로세스에서 큐에 들어간 수 + 다른 워커의 방 참여자 수)
+        """
+        self.bus.publish(room, message)
+        return self.deliver(room, message, exclude) + self.bus.remote_room_size(room)
+
+    def deliver(self, room: str, message: dict, exclude: Connection = None) -> int:
+        """
+        이 프로세스에 있는 방 참여자들에게만 메시지 전송
+        (다른 워커에서 버스로 전달된 브로드캐스트도 이 함수로 처리됨)
+
+        반환값: 메시지가 큐에 들어간 연결 수
+        """
+        members = self.rooms.get(room)
+        if not members:
+            return 0
+        frames = {}                          # 코덱 → 인코딩된 프레임 (코덱마다 한 번만 인코딩)
+        delivered = 0
+        # 전송 중 연결이 끊겨 집합이 바뀔 수 있으므로 복사본으로 순회
+        for conn in tuple(members):
+            if conn is exclude:
+                continue
+            codec = conn.codec
+            frame = frames.get(codec)
+            if frame is None:
+                frame = frames[codec] = codec.encode({**message, "timestamp": codec.timestamp()})
+            if conn.send(frame):
+                delivered += 1
+        return delivered
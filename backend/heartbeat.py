@@ -0,0 +1,143 @@
+"""
+하트비트(heartbeat)와 유휴 연결 정리
+
+모바일/발표 클라이언트는 네트워크가 끊겨도 서버에 종료 신호를 보내지 못하는 경우가 많습니다.
+이런 "반쯤 열린" 연결은 수신 루프가 영원히 기다리게 만들고 /health의 연결 수를 부풀립니다.
+
+동작 방식:
+1. 클라이언트가 HEARTBEAT_INTERVAL초 동안 아무 메시지도 보내지 않으면 {"type": "ping"}을 보냄
+2. 클라이언트는 {"type": "pong"} (또는 아무 메시지)으로 응답
+3. IDLE_TIMEOUT초 동안 아무 메시지도 없으면 연결을 끊고 관리자에서 즉시 등록 해제
+
+연결마다 잠들어 있는 태스크를 두는 대신, 타이머 휠(TimerWheel) 하나와 태스크 하나로
+모든 연결을 처리합니다. 메시지를 받을 때는 마지막 수신 시각만 갱신하고,
+타이머가 만료된 연결만 그때 실제 유휴 시간을 확인하므로 연결 수가 많아져도 비용이 일정합니다.
+"""
+
+import asyncio
+import math
+import time
+
+from metrics import REAPED
+
+# 유휴 연결을 끊을 때 사용하는 WebSocket 종료 코드 (1001: going away)
+IDLE_CLOSE_CODE = 1001
+
+# 서버가 보내는 ping 메시지
+PING_MESSAGE = {"type": "ping"}
+
+
+class TimerWheel:
+    """
+    해시 타이머 휠
+
+    - 시간을 tick초 단위 칸(slot)으로 나누고, 각 항목을 만료될 칸에 넣어 둠
+    - advance()를 호출할 때마다 한 칸씩 전진하며 그 칸의 항목들을 꺼냄
+    - 예약/취소/만료 모두 O(1) (만료된 항목 수에만 비례)
+    """
+
+    def __init__(self, tick: float, slots: int):
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self.cursor = 0                      # 현재 칸 위치
+        self.where = {}                      # 항목 → 들어 있는 칸 번호
+
+    def __len__(self) -> int:
+        return len(self.where)
+
+    def schedule(self, item, delay: float):
+        """delay초 뒤에 만료되도록 예약 (이미 예약된 항목이면 다시 예약)"""
+        self.cancel(item)
+        ticks = min(len(self.slots) - 1, max(1, math.ceil(delay / self.tick)))
+        index = (self.cursor + ticks) % len(self.slots)
+        self.slots[index].add(item)
+        self.where[item] = index
+
+    def cancel(self, item):
+        """예약 취소 (예약되지 않은 항목이면 무시)"""
+        index = self.where.pop(item, None)
+        if index is not None:
+            self.slots[index].discard(item)
+
+    def advance(self) -> set:
+        """한 칸 전진하고 그 칸에서 만료된 항목들을 반환"""
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        expired = self.slots[self.cursor]
+        self.slots[self.cursor] = set()
+        for item in expired:
+            del self.where[item]
+        return expired
+
+
+class Heartbeat:
+    """
+    연결 관리자의 모든 연결에 대한 ping 전송 및 유휴 연결 정리
+
+    - track(conn): 새 연결 등록 (ConnectionManager.register에서 호출)
+    - forget(conn): 연결 제거 (ConnectionManager.unregister에서 호출)
+    - 수신 루프는 메시지를 받을 때마다 conn.last_seen만 갱신하면 됨
+    """
+
+    def __init__(self, manager, interval: float, idle_timeout: float, tick: float = 1.0):
+        self.manager = manager
+        self.interval = interval             # 마지막 수신 후 ping을 보낼 때까지의 시간 (초)
+        self.idle_timeout = idle_timeout     # 마지막 수신 후 연결을 끊을 때까지의 시간 (초)
+        self.wheel = TimerWheel(tick, math.ceil(max(interval, idle_timeout) / tick) + 2)
+        self._ping_frames = {}               # 코덱 이름 → 미리 인코딩된 ping 프레임
+        self._task = None
+
+    def track(self, conn):
+        conn.last_seen = time.monotonic()
+        self.wheel.schedule(conn, min(self.interval, self.idle_timeout))
+
+    def forget(self, conn):
+        self.wheel.cancel(conn)
+
+    def start(self):
+        """정리 태스크 시작"""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        """정리 태스크 종료"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        """tick초마다 타이머 휠을 전진시키는 태스크 (루프가 늦어진 만큼 여러 칸을 전진)"""
+        tick = self.wheel.tick
+        next_tick = time.monotonic() + tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            now = time.monotonic()
+            while next_tick <= now:
+                for conn in self.wheel.advance():
+                    self._check(conn, now)
+                next_tick += tick
+            # 보관 시간이 지난 세션도 함께 정리 (새 연결이 없어도 메모리가 풀리도록, sessions.py)
+            sessions = self.manager.sessions
+            if sessions is not None:
+                sessions.purge(now)
+
+    def _check(self, conn, now: float):
+        """타이머가 만료된 연결의 실제 유휴 시간을 확인해서 정리/ping/재예약"""
+        idle = now - conn.last_seen
+        if idle >= self.idle_timeout:
+            self.reap(conn)
+        elif idle >= self.interval:
+            conn.send(self._ping_frame(conn.codec), replay=False)
+            self.wheel.schedule(conn, min(self.interval, self.idle_timeout - idle))
+        else:
+            self.wheel.schedule(conn, self.interval - idle)
+
+    def reap(self, conn):
+        """유휴 연결을 끊고 관리자에서 즉시 등록 해제"""
+        conn.close(IDLE_CLOSE_CODE, "idle timeout")
+        self.manager.unregister(conn)
+        REAPED.inc()
+
+    def _ping_frame(self, codec):
+        frame = self._ping_frames.get(codec.name)
+        if frame is None:
+            frame = self._ping_frames[codec.name] = codec.encode(PING_MESSAGE)
+        return frame
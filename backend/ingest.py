@@ -0,0 +1,222 @@
+"""
+스트리밍 데이터 분석 파이프라인 (발표 오디오 / 대본 조각)
+
+스트리밍 모드(ws://localhost:8000/ws?mode=stream)에서 클라이언트가 보내는 바이너리 프레임을
+연결별 링 버퍼에 모으고, 일정 크기(윈도우)가 찰 때마다 분석 단계(stage)들을 실행해서
+결과를 바로 클라이언트에게 돌려보냅니다.
+
+특징:
+1. 분석은 별도 프로세스 풀에서 실행 - CPU를 많이 쓰는 분석이 다른 연결을 막지 않음
+2. 동시에 분석 중인 윈도우 수는 INGEST_MAX_INFLIGHT개로 제한
+   - 풀이 바쁘면 수신 루프가 기다리므로 보내는 쪽에 배압(backpressure)이 걸림
+3. 분석 단계는 @register_stage로 추가 가능 (모듈 최상위 함수여야 함 - 다른 프로세스로 전달되기 때문)
+
+분석 단계 추가 예:
+    @register_stage("my_stage")
+    def my_stage(data: bytes) -> dict:
+        return {"size": len(data)}
+"""
+
+import asyncio
+import math
+import multiprocessing
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from metrics import INGEST_SECONDS, INGEST_WINDOWS
+
+# 분석 단계 이름 → 함수 (bytes → dict)
+STAGES = {}
+
+
+def register_stage(name: str):
+    """분석 단계 등록 데코레이터"""
+    def decorator(func):
+        STAGES[name] = func
+        return func
+    return decorator
+
+
+@register_stage("audio_level")
+def audio_level(data: bytes) -> dict:
+    """16비트 리틀 엔디언 PCM 오디오의 음량 (RMS, 최댓값, 0.0 ~ 1.0)"""
+    samples = array("h")
+    samples.frombytes(data[:len(data) // 2 * 2])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return {"rms": 0.0, "peak": 0.0, "samples": 0}
+    peak = max(max(samples), -min(samples))
+    rms = math.sqrt(sum(s * s for s in samples) / len(samples))
+    return {"rms": round(rms / 32768, 4), "peak": round(peak / 32768, 4), "samples": len(samples)}
+
+
+@register_stage("text_stats")
+def text_stats(data: bytes) -> dict:
+    """UTF-8 대본 조각의 글자 수, 단어 수, 문장 수"""
+    text = data.decode("utf-8", "replace")
+    sentences = sum(text.count(mark) for mark in ".!?")
+    return {"chars": len(text), "words": len(text.split()), "sentences": sentences}
+
+
+def analyze_window(stages: list, data: bytes) -> dict:
+    """
+    윈도우 하나에 분석 단계들을 차례로 실행 (프로세스 풀에서 실행됨)
+
+    stages: [(이름, 함수), ...] - 함수 자체를 넘기므로 다른 모듈에서 등록한 단계도 사용 가능
+    """
+    return {name: func(data) for name, func in stages}
+
+
+class RingBuffer:
+    """
+    크기가 고정된 원형 바이트 버퍼
+
+    - write(): 뒤에 데이터 추가 (공간이 부족하면 False)
+    - read(): 앞에서 n바이트 꺼냄
+    - 메모리를 처음에 한 번만 할당하고 계속 재사용
+    """
+
+    __slots__ = ("buffer", "capacity", "start", "size")
+
+    def __init__(self, capacity: int):
+        self.buffer = bytearray(capacity)
+        self.capacity = capacity
+        self.start = 0                       # 가장 오래된 데이터 위치
+        self.size = 0                        # 저장된 데이터 크기
+
+    def free(self) -> int:
+        return self.capacity - self.size
+
+    def write(self, data) -> bool:
+        n = len(data)
+        if n > self.capacity - self.size:
+            return False
+        data = memoryview(data)
+        end = (self.start + self.size) % self.capacity
+        first = min(n, self.capacity - end)
+        self.buffer[end:end + first] = data[:first]
+        self.buffer[:n - first] = data[first:]
+        self.size += n
+        return True
+
+    def read(self, n: int) -> bytes:
+        if n <= 0:
+            raise ValueError(f"읽을 크기는 1 이상이어야 합니다: {n}")
+        n = min(n, self.size)
+        first = min(n, self.capacity - self.start)
+        data = bytes(self.buffer[self.start:self.start + first]) + bytes(self.buffer[:n - first])
+        self.start = (self.start + n) % self.capacity
+        self.size -= n
+        return data
+
+
+class IngestPipeline:
+    """
+    모든 스트리밍 연결이 공유하는 분석 프로세스 풀
+
+    - processes: 분석 프로세스 수
+    - max_inflight: 동시에 분석 중일 수 있는 윈도우 수 (넘으면 수신 루프가 기다림)
+    """
+
+    def __init__(self, processes: int, max_inflight: int):
+        self.processes = processes
+        self.slots = asyncio.Semaphore(max_inflight)
+        self._pool = None
+
+    def pool(self) -> ProcessPoolExecutor:
+        """프로세스 풀 (처음 사용할 때 생성)"""
+        if self._pool is None:
+            # fork는 로그 출력 스레드 등을 가진 프로세스에서 안전하지 않으므로 spawn 사용
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def session(self, conn, stage_names: list, window_bytes: int, buffer_bytes: int) -> "IngestSession":
+        """연결 하나의 스트리밍 세션 생성 (알 수 없는 단계 이름이면 KeyError)"""
+        stages = [(name, STAGES[name]) for name in stage_names]
+        return IngestSession(self, conn, stages, window_bytes, buffer_bytes)
+
+    def shutdown(self):
+        """프로세스 풀 종료 (서버 종료 시 호출)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class IngestSession:
+    """연결 하나의 스트리밍 세션: 링 버퍼 + 윈도우 단위 분석 요청"""
+
+    def __init__(self, pipeline: IngestPipeline, conn, stages: list, window_bytes: int, buffer_bytes: int):
+        if window_bytes <= 0:
+            # 0 이하이면 feed()가 빈 윈도우를 끝없이 분석 요청함
+            raise ValueError(f"윈도우 크기는 1 이상이어야 합니다: {window_bytes}")
+        self.pipeline = pipeline
+        self.conn = conn
+        self.stages = stages
+        self.window_bytes = window_bytes
+        self.buffer = RingBuffer(max(buffer_bytes, window_bytes))
+        self.windows = 0                     # 분석을 요청한 윈도우 수
+        self.offset = 0                      # 다음 윈도우의 시작 위치 (스트림 전체 기준 바이트)
+
+    async def feed(self, chunk: bytes) -> bool:
+        """
+        데이터 조각을 버퍼에 넣고, 윈도우가 찰 때마다 분석 요청
+
+        분석 풀이 바쁘면 자리가 날 때까지 기다림 (그동안 클라이언트 메시지를 읽지 않음)
+        반환값: 조각이 버퍼보다 커서 버렸으면 False
+        """
+        if not self.buffer.write(chunk):
+            return False
+        while self.buffer.size >= self.window_bytes:
+            await self._dispatch(self.buffer.read(self.window_bytes))
+        return True
+
+    async def flush(self):
+        """남아 있는 데이터(윈도우보다 작아도)를 마지막 윈도우로 분석 요청"""
+        if self.buffer.size:
+            await self._dispatch(self.buffer.read(self.buffer.size))
+
+    async def _dispatch(self, data: bytes):
+        pipeline = self.pipeline
+        await pipeline.slots.acquire()
+        index, offset = self.windows, self.offset
+        self.windows += 1
+        self.offset += len(data)
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(pipeline.pool(), analyze_window, self.stages, data)
+        except Exception:
+            pipeline.slots.release()
+            raise
+        future.add_done_callback(lambda f: self._on_done(f, index, offset, len(data), started))
+
+    def _on_done(self, future: asyncio.Future, index: int, offset: int, size: int, started: float):
+        """분석이 끝나면 (이벤트 루프에서) 결과를 바로 클라이언트에게 전송"""
+        self.pipeline.slots.release()
+        codec = self.conn.codec
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            INGEST_WINDOWS.inc("failed")
+            self.conn.send_message({
+                "type": "error",
+                "code": "analysis_failed",
+                "window": index,
+                "error": type(error).__name__,
+                "timestamp": codec.timestamp(),
+            })
+            return
+        INGEST_WINDOWS.inc("ok")
+        INGEST_SECONDS.observe(time.perf_counter() - started)
+        self.conn.send_message({
+            "type": "analysis",
+            "window": index,                 # 윈도우 번호 (0부터)
+            "offset": offset,                # 스트림 전체 기준 시작 위치 (바이트)
+            "size": size,                    # 윈도우 크기 (바이트)
+            "results": future.result(),      # 분석 단계 이름 → 결과
+            "timestamp": codec.timestamp(),
+        })
@@ -0,0 +1,112 @@
+"""
+연결별 수신 제한 (메시지 크기, 전송 속도)
+
+클라이언트 하나가 너무 큰 메시지나 너무 많은 메시지를 보내서
+이벤트 루프와 메모리를 독차지하지 못하게 막습니다.
+
+- 크기 제한: config.MAX_FRAME_BYTES보다 큰 메시지는 해석하지 않고 거절
+- 속도 제한: 토큰 버킷 방식 (초당 RATE_LIMIT_PER_SEC개, 순간적으로 RATE_LIMIT_BURST개까지 허용, 0이면 제한 없음)
+- 거절 응답은 코덱별로 미리 인코딩해 둔 프레임을 그대로 보냄 (JSON 파싱/인코딩 비용 없음)
+- 스트리밍 데이터 조각(ingest.py)은 개수 대신 초당 바이트 수로 제한 (INGEST_BYTES_PER_SEC)
+  - 짧은 오디오 조각을 자주 보내도 메시지 개수 제한에 걸려 데이터를 잃지 않음
+- 연속으로 RATE_LIMIT_MAX_STRIKES번 거절되면 연결을 끊음
+"""
+
+import time
+
+# 제한을 계속 어긴 클라이언트의 연결을 끊을 때 사용하는 WebSocket 종료 코드 (1008: 정책 위반)
+POLICY_VIOLATION_CLOSE_CODE = 1008
+
+# 거절 사유별 응답 메시지
+REJECTION_MESSAGES = {
+    "too_large": {"type": "error", "code": "too_large", "error": "메시지가 너무 큽니다"},
+    "rate_limited": {"type": "error", "code": "rate_limited", "error": "메시지를 너무 빠르게 보내고 있습니다"},
+}
+
+# (코덱, 거절 사유) → 미리 인코딩된 프레임
+_rejection_frames = {}
+
+
+def rejection_frame(codec, reason: str):
+    """거절 응답 프레임 - 코덱별로 한 번만 인코딩하고 이후에는 그대로 재사용"""
+    key = (codec.name, reason)
+    frame = _rejection_frames.get(key)
+    if frame is None:
+        frame = _rejection_frames[key] = codec.encode(REJECTION_MESSAGES[reason])
+    return frame
+
+
+class TokenBucket:
+    """
+    토큰 버킷 속도 제한
+
+    - 토큰이 초당 rate개씩 채워지고, 최대 capacity개까지 쌓임
+    - 메시지 하나를 처리할 때마다 토큰 1개를 사용 (바이트 수로 제한할 때는 크기만큼 사용)
+    - 토큰이 없으면 거절
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, amount: float = 1) -> bool:
+        """토큰 amount개 사용 - 성공하면 True"""
+        now = time.monotonic()
+        tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if tokens < amount:
+            self.tokens = tokens
+            return False
+        self.tokens = tokens - amount
+        return True
+
+
+class FrameLimiter:
+    """
+    연결 하나의 수신 제한 검사
+
+    사용 예:
+        limiter = FrameLimiter(max_frame_bytes=65536, rate=50, burst=100, max_strikes=20)
+        reason = limiter.check(len(data))    # None이면 통과, 아니면 "too_large" / "rate_limited"
+        reason = limiter.check(len(chunk), chunk=True)   # 스트리밍 데이터 조각 (바이트 수 제한)
+        if limiter.exhausted:                # 연속 거절 횟수 초과 → 연결 종료
+            ...
+    """
+
+    __slots__ = ("max_frame_bytes", "bucket", "byte_bucket", "max_strikes", "strikes")
+
+    def __init__(self, max_frame_bytes: int, rate: float, burst: float, max_strikes: int,
+                 byte_rate: float = 0, byte_burst: float = 0):
+        self.max_frame_bytes = max_frame_bytes
+        self.bucket = TokenBucket(rate, burst) if rate > 0 else None   # rate가 0이면 속도 제한 없음
+        # 데이터 조각용 바이트 버킷 - 가장 큰 조각 하나는 항상 들어갈 수 있도록 용량을 max_frame_bytes 이상으로
+        self.byte_bucket = TokenBucket(byte_rate, max(byte_burst, max_frame_bytes)) if byte_rate > 0 else None
+        self.max_strikes = max_strikes
+        self.strikes = 0                     # 연속으로 거절된 횟수
+
+    def check(self, size: int, chunk: bool = False):
+        """
+        메시지 크기(텍스트는 문자 수, 바이너리는 바이트 수)를 검사
+
+        chunk=True: 스트리밍 데이터 조각 - 메시지 개수 대신 바이트 수로 속도 제한
+        반환값: 통과하면 None, 거절하면 사유 ("too_large" 또는 "rate_limited")
+        """
+        bucket = self.byte_bucket if chunk else self.bucket
+        if size > self.max_frame_bytes:
+            reason = "too_large"
+        elif bucket is not None and not bucket.consume(size if chunk else 1):
+            reason = "rate_limited"
+        else:
+            self.strikes = 0
+            return None
+        self.strikes += 1
+        return reason
+
+    @property
+    def exhausted(self) -> bool:
+        """연속 거절 횟수가 한도에 도달했는지"""
+        return self.strikes >= self.max_strikes
@@ -0,0 +1,129 @@
+"""
+구조화 로깅 설정
+
+print()는 표준 출력에 바로 쓰기 때문에 메시지가 많아지면 이벤트 루프를 막습니다.
+이 모듈은 로그를 큐에 넣기만 하고, 실제 출력은 별도 스레드(QueueListener)가 담당하게 합니다.
+
+특징:
+1. 한 줄에 하나의 JSON 객체로 출력 - {"ts": ..., "level": ..., "event": ..., 추가 필드들}
+2. 로그 레벨은 config.LOG_LEVEL을 따름
+3. 메시지마다 남기는 로그는 샘플링 (sampled=True) - 일부만 출력
+4. 로그 큐가 가득 차면 이벤트 루프를 기다리게 하지 않고 로그를 버림
+
+사용 예:
+    log = setup_logging("info", sample_rate=0.01)
+    log.info("ws_connected", connection_id=1, connections=10)
+    log.debug("ws_message", sampled=True, outcome="echo", size=12)
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+# 로거 이름
+LOGGER_NAME = "presentation_angel"
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 로그를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0                     # 버린 로그 수
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class EventLogger:
+    """
+    이벤트 이름 + 키워드 필드 형태로 로그를 남기는 얇은 래퍼
+
+    레벨이 꺼져 있으면 레코드를 만들지 않고 바로 반환하므로 메시지 처리 경로에서도 부담이 적음
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float):
+        self.logger = logger
+        self.sample_rate = sample_rate       # sampled=True인 로그를 남길 비율 (0.0 ~ 1.0)
+        self.handler = None                  # setup_logging()이 연결한 DroppingQueueHandler
+        self.listener = None                 # 실제 출력을 담당하는 QueueListener
+
+    def log(self, level: int, event: str, sampled: bool = False, **fields):
+        if not self.logger.isEnabledFor(level):
+            return
+        if sampled and random.random() >= self.sample_rate:
+            return
+        self.logger.log(level, event, extra={"fields": fields})
+
+    def debug(self, event: str, sampled: bool = False, **fields):
+        self.log(logging.DEBUG, event, sampled, **fields)
+
+    def info(self, event: str, sampled: bool = False, **fields):
+        self.log(logging.INFO, event, sampled, **fields)
+
+    def warning(self, event: str, sampled: bool = False, **fields):
+        self.log(logging.WARNING, event, sampled, **fields)
+
+    def error(self, event: str, sampled: bool = False, **fields):
+        self.log(logging.ERROR, event, sampled, **fields)
+
+    def dropped(self) -> int:
+        """로그 큐가 가득 차서 버린 로그 수"""
+        return self.handler.dropped if self.handler is not None else 0
+
+    def stop(self):
+        """남은 로그를 모두 출력하고 출력 스레드를 종료"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+def setup_logging(level: str, sample_rate: float = 1.0, queue_size: int = 10000) -> EventLogger:
+    """
+    큐 기반 구조화 로거를 설정하고 EventLogger를 반환
+
+    - level: "debug", "info", "warning", "error" (config.LOG_LEVEL)
+    - sample_rate: sampled=True 로그를 남길 비율
+    - queue_size: 출력 대기 중인 로그의 최대 개수
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper())
+    logger.propagate = False                 # uvicorn 로거 등 상위 로거로 중복 출력하지 않음
+
+    # 출력 스레드 쪽: 표준 출력에 JSON 한 줄씩
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    # 이벤트 루프 쪽: 큐에 넣기만 함
+    log_queue = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    logger.handlers[:] = [handler]
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    listener.start()
+
+    event_logger = EventLogger(logger, sample_rate)
+    event_logger.handler = handler
+    event_logger.listener = listener
+    return event_logger
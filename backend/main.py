@@ -6,21 +6,63 @@ FastAPI + WebSocket을 사용한 백엔드 서버
 1. WebSocket을 통한 실시간 통신
 2. 클라이언트가 보낸 메시지를 에코(그대로 돌려보내기)
 3. JSON 형식의 메시지 처리
+4. 방(room) 단위 브로드캐스트 (예: 발표자 → 청중)
+5. 서브프로토콜로 메시지 형식 선택 (JSON 텍스트 / MessagePack 바이너리)
+6. 여러 워커 프로세스로 실행 (워커 간 브로드캐스트/연결 수 공유)
+7. 구조화 로깅(별도 스레드에서 출력)과 /metrics 성능 지표
+8. 연결별 메시지 크기/속도 제한과 배압(backpressure)
+9. 하트비트(ping/pong)와 유휴 연결 정리
+10. 스트리밍 모드 - 바이너리 데이터 조각을 별도 프로세스에서 분석하고 결과를 바로 전송
+11. 세션 이어받기 - 재연결한 클라이언트에게 놓친 메시지만 다시 전송
+12. 메시지 종류("type")별 핸들러 라우팅과 pydantic 형식 검사
 """
 
 # 필요한 라이브러리들을 가져오기 (import)
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect  # FastAPI 웹 프레임워크
 from fastapi.middleware.cors import CORSMiddleware           # 브라우저 보안 정책(CORS) 처리
+from fastapi.responses import PlainTextResponse              # /metrics 텍스트 응답
 import uvicorn                                              # ASGI 서버 (FastAPI 실행용)
-import json                                                 # JSON 데이터 처리
+import asyncio                                              # 백그라운드 태스크 관리
+import multiprocessing                                      # 멀티 워커 모드에서 허브 프로세스 실행
+import time                                                 # 메시지 처리 시간 측정
+from contextlib import asynccontextmanager                  # 서버 시작/종료 처리 (lifespan)
 from datetime import datetime                               # 시간 정보 처리
 
 import config  # 우리가 만든 설정 파일
+from bus import LocalBus, UnixSocketBus, run_hub  # 워커 프로세스 간 메시지 버스
+from connection_manager import ConnectionManager  # WebSocket 연결 관리자
+from ingest import IngestPipeline  # 스트리밍 데이터 분석 파이프라인
+from limits import POLICY_VIOLATION_CLOSE_CODE, FrameLimiter, rejection_frame  # 연결별 수신 제한
+from logging_setup import setup_logging  # 구조화 로깅
+from metrics import (  # 성능 지표
+    HANDLING_SECONDS, MESSAGES, RECEIVED_BYTES, REGISTRY, SENT_BYTES, SESSIONS_OPENED,
+    monitor_loop_lag, register_connection_gauges,
+)
+from router import MessageContext, error_message, router  # 메시지 종류별 핸들러
+from wire import JSON_CODEC, DecodeError, receive_message, select_codec  # 메시지 형식(코덱) 처리
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    서버 시작/종료 시 실행되는 함수 (yield 앞: 시작할 때, yield 뒤: 종료할 때)
+
+    시작: 메시지 핸들러 준비, 메시지 버스 연결, 이벤트 루프 지연 측정 시작
+    종료: 메시지 버스 연결 해제, 백그라운드 태스크/분석 프로세스 정리, 남은 로그 출력
+    """
+    router.compile()
+    await manager.start()
+    lag_monitor = asyncio.create_task(monitor_loop_lag())
+    yield
+    lag_monitor.cancel()
+    await manager.stop()
+    ingest.shutdown()
+    log.stop()
 
 # FastAPI 애플리케이션 인스턴스 생성
 # title: API 문서에 표시될 제목
 # version: API 버전
-app = FastAPI(title="PresentationAngel Backend", version="1.0.0")
+# lifespan: 서버 시작/종료 시 실행할 함수 (위에서 정의)
+app = FastAPI(title="PresentationAngel Backend", version="1.0.0", lifespan=lifespan)
 
 # CORS(Cross-Origin Resource Sharing) 미들웨어 설정
 # 브라우저가 다른 도메인의 서버에 요청을 보낼 수 있도록 허용
@@ -33,9 +75,30 @@ app.add_middleware(
     allow_headers=["*"],                   # 모든 HTTP 헤더 허용
 )
 
-# 현재 연결된 WebSocket 클라이언트들을 저장하는 리스트
-# 나중에 여러 클라이언트가 동시에 연결될 때 관리하기 위함
-active_connections = []
+# 현재 연결된 WebSocket 클라이언트들과 방(room)을 관리하는 객체
+# 등록/해제가 O(1)이고, 연결마다 크기가 제한된 송신 큐를 가짐
+# 워커가 여러 개면 Unix 도메인 소켓 버스로 다른 워커들과 브로드캐스트/연결 수를 공유
+manager = ConnectionManager(
+    queue_size=config.SEND_QUEUE_SIZE,                 # 연결별 송신 큐 크기
+    slow_consumer_policy=config.SLOW_CONSUMER_POLICY,  # 느린 클라이언트 처리 정책
+    bus=UnixSocketBus(config.BUS_SOCKET_PATH) if config.WORKERS > 1 else LocalBus(),
+    heartbeat_interval=config.HEARTBEAT_INTERVAL,      # 이 시간 동안 조용하면 ping 전송
+    idle_timeout=config.IDLE_TIMEOUT,                  # 이 시간 동안 조용하면 연결 종료
+    heartbeat_tick=config.HEARTBEAT_TICK,              # 타이머 휠 한 칸의 시간
+    session_ttl=config.SESSION_TTL,                    # 끊긴 세션을 보관하는 시간
+    session_replay_messages=config.SESSION_REPLAY_MESSAGES,  # 세션마다 보관하는 메시지 수
+    session_memory_bytes=config.SESSION_MEMORY_BYTES,  # 모든 세션의 보관 메시지 크기 한도
+)
+
+# 스트리밍 모드 분석 프로세스 풀 (모든 스트리밍 연결이 공유, 처음 사용할 때 생성)
+ingest = IngestPipeline(processes=config.INGEST_PROCESSES, max_inflight=config.INGEST_MAX_INFLIGHT)
+
+# 구조화 로거 (print 대신 사용 - 출력은 별도 스레드가 담당하므로 이벤트 루프를 막지 않음)
+# 메시지 내용은 기록하지 않고 크기, 처리 결과 등만 기록
+log = setup_logging(config.LOG_LEVEL, sample_rate=config.LOG_SAMPLE_RATE, queue_size=config.LOG_QUEUE_SIZE)
+
+# /metrics에서 보여줄 연결 상태 지표 등록
+register_connection_gauges(manager, log)
 
 @app.get("/")
 async def root():
@@ -62,69 +125,199 @@ async def websocket_endpoint(websocket: WebSocket):
     1. 클라이언트의 WebSocket 연결 요청을 받아들임
     2. 연결 성공 메시지를 클라이언트에게 전송
     3. 클라이언트가 보내는 메시지를 기다림
-    4. 받은 메시지를 그대로 다시 돌려보냄 (에코)
+    4. 받은 메시지의 "type"에 맞는 핸들러로 처리 (router.py)
+       - 기본: 받은 메시지를 그대로 다시 돌려보냄 (에코)
+       - {"type": "broadcast"} 메시지는 같은 방의 다른 클라이언트들에게 전달
+       - 형식이 틀리면 {"type": "error", "code": "invalid_message", ...}로 응답
+    
+    제한 (config.py에서 설정):
+    - 너무 크거나 너무 빠르게 들어오는 메시지는 해석하지 않고 미리 만들어 둔 거절 응답을 보냄
+    - 거절이 계속되면 연결을 끊음 (종료 코드 1008)
+    - 아직 보내지 못한 응답이 MAX_PENDING_SENDS개 이상 쌓이면 새 메시지를 읽지 않고 기다림
+    - HEARTBEAT_INTERVAL초 동안 조용하면 {"type": "ping"}을 보내고, IDLE_TIMEOUT초 동안 조용하면 연결을 끊음
+      (클라이언트는 {"type": "pong"}으로 응답)
+    
+    방(room) 참여: ws://localhost:8000/ws?room=방이름
+    메시지 형식: 서브프로토콜 "pa.json.v1"(기본값) 또는 "pa.msgpack.v1" (wire.py 참고)
+    스트리밍 모드: ws://localhost:8000/ws?mode=stream&stages=audio_level,text_stats&window=32000
+    - 바이너리 프레임은 데이터 조각으로 모아서 window바이트마다 분석 (ingest.py)
+    - 분석 결과는 {"type": "analysis", ...}로 윈도우마다 바로 전송
+    - {"type": "stream_end"}를 보내면 남은 데이터까지 분석 (제어 메시지는 항상 JSON 텍스트 프레임)
+    세션 이어받기: ws://localhost:8000/ws?session=토큰&last_seq=마지막으로받은순번
+    - 환영 메시지의 "session" 토큰으로 다시 연결하면 last_seq 이후에 보낸 메시지만 다시 보냄 (sessions.py)
     """
     
-    # 1단계: WebSocket 연결 요청을 수락
-    await websocket.accept()
+    # 1단계: 클라이언트가 요청한 서브프로토콜로 코덱을 고르고 WebSocket 연결 요청을 수락
+    codec, subprotocol = select_codec(websocket)
+    await websocket.accept(subprotocol=subprotocol)
+    
+    # 2단계: 연결된 클라이언트를 관리자에 등록 (쿼리 파라미터로 방 참여)
+    conn = manager.register(websocket, codec)
+    room = websocket.query_params.get("room")
+    if room:
+        manager.join(conn, room)
     
-    # 2단계: 연결된 클라이언트를 관리 리스트에 추가
-    active_connections.append(websocket)
+    # 세션 이어받기 - 토큰의 세션이 남아 있으면 놓친 메시지 목록, 아니면 새 세션 (missed는 None)
+    missed = None
+    if manager.sessions is not None:
+        try:
+            last_seq = int(websocket.query_params["last_seq"])
+        except (KeyError, ValueError):
+            last_seq = None
+        missed = manager.sessions.open(conn, websocket.query_params.get("session"), last_seq)
+        SESSIONS_OPENED.inc("new" if missed is None else "resumed")
+    
+    # 이 연결의 수신 제한 (메시지 크기, 토큰 버킷 속도 제한, 스트리밍 데이터 조각은 초당 바이트 수로 제한)
+    limiter = FrameLimiter(
+        max_frame_bytes=config.MAX_FRAME_BYTES,
+        rate=config.RATE_LIMIT_PER_SEC,
+        burst=config.RATE_LIMIT_BURST,
+        max_strikes=config.RATE_LIMIT_MAX_STRIKES,
+        byte_rate=config.INGEST_BYTES_PER_SEC,
+        byte_burst=config.INGEST_BURST_BYTES,
+    )
     
     try:
+        # 스트리밍 모드 설정 (쿼리 파라미터로 분석 단계와 윈도우 크기 지정)
+        stream = None
+        if websocket.query_params.get("mode") == "stream":
+            stage_names = [name for name in websocket.query_params.get("stages", config.INGEST_DEFAULT_STAGES).split(",") if name]
+            try:
+                window_bytes = int(websocket.query_params.get("window", config.INGEST_WINDOW_BYTES))
+            except ValueError:
+                window_bytes = config.INGEST_WINDOW_BYTES
+            window_bytes = min(max(window_bytes, config.INGEST_MIN_WINDOW_BYTES), config.INGEST_BUFFER_BYTES)
+            # 링 버퍼에는 윈도우보다 작게 남은 데이터 + 가장 큰 데이터 조각이 함께 들어갈 수 있어야 함
+            buffer_bytes = max(config.INGEST_BUFFER_BYTES, window_bytes + config.MAX_FRAME_BYTES)
+            try:
+                stream = ingest.session(conn, stage_names, window_bytes, buffer_bytes)
+            except KeyError as e:
+                # 등록되지 않은 분석 단계 → 연결 종료 (1008: 정책 위반)
+                closing = conn.close(POLICY_VIOLATION_CLOSE_CODE, f"unknown stage: {e.args[0]}")
+                if closing is not None:
+                    await closing
+                return
+        
+        # 메시지를 해석할 코덱 - 스트리밍 모드에서는 바이너리 프레임이 데이터 조각이므로
+        # 제어 메시지(stream_end 등)는 연결 형식과 관계없이 JSON 텍스트 프레임으로 받음 (응답은 연결 형식 그대로)
+        message_codec = JSON_CODEC if stream is not None else codec
+        
+        # 핸들러에 전달할 연결 정보 (router.py)
+        ctx = MessageContext(conn, manager, room=room, stream=stream)
+        
         # 3단계: 클라이언트에게 연결 성공 알림 메시지 전송
         welcome_message = {
             "type": "connection",                          # 메시지 타입: 연결 알림
             "message": "WebSocket 연결이 성공했습니다",        # 사용자에게 보여줄 메시지
-            "timestamp": datetime.now().isoformat(),       # 현재 시간 (ISO 형식)
-            "connections": len(active_connections)         # 현재 총 연결 수
+            "timestamp": codec.timestamp(),                # 현재 시간 (JSON: ISO 형식, MessagePack: epoch 밀리초)
+            "connections": manager.total_connections()     # 현재 총 연결 수 (모든 워커 합계)
         }
-        # JSON 형태로 변환하여 전송
-        await websocket.send_text(json.dumps(welcome_message))
-        print(f"새 클라이언트 연결됨. 총 연결 수: {len(active_connections)}")
+        if room:
+            welcome_message["room"] = room                 # 참여한 방 이름
+        if stream is not None:
+            welcome_message["mode"] = "stream"             # 스트리밍 모드
+            welcome_message["stages"] = stage_names        # 실행할 분석 단계들
+            welcome_message["window"] = window_bytes       # 분석 윈도우 크기 (바이트)
+        if conn.session is not None:
+            welcome_message["session"] = conn.session.token  # 재연결할 때 사용할 세션 토큰
+            welcome_message["resumed"] = missed is not None  # 이전 세션을 이어받았는지
+            welcome_message["seq"] = conn.session.seq        # 지금까지 보낸 마지막 순번
+            welcome_message["replayed"] = len(missed or ())  # 다시 보내는 메시지 수
+        # 코덱으로 인코딩하여 송신 큐에 넣음 (실제 전송은 연결별 송신 태스크가 담당)
+        # 환영 메시지는 연결마다 새로 보내므로 순번을 붙이지 않음
+        conn.send_message(welcome_message, replay=False)
+        # 놓친 메시지는 보관해 둔 프레임(순번 포함) 그대로 다시 보냄
+        # (그동안 새로 보내지는 브로드캐스트 등은 순번 순서대로 그 뒤에 보내짐)
+        if missed:
+            await conn.replay(missed, config.MAX_PENDING_SENDS)
+        log.info("ws_connected", connection_id=conn.id, codec=codec.name, room=room,
+                 connections=manager.total_connections(), resumed=missed is not None, replayed=len(missed or ()))
         
         # 4단계: 무한 루프로 클라이언트 메시지 대기
         # WebSocket은 연결이 유지되는 동안 계속 메시지를 주고받을 수 있음
         while True:
-            # 클라이언트로부터 텍스트 메시지 수신 (대기 상태)
-            data = await websocket.receive_text()
+            # 아직 보내지 못한 응답이 너무 많으면 송신 큐가 비워질 때까지 읽기를 멈춤 (배압)
+            if conn.queue.qsize() >= config.MAX_PENDING_SENDS:
+                await conn.wait_drained(config.MAX_PENDING_SENDS)
+            
+            # 클라이언트로부터 메시지 수신 (대기 상태) - JSON은 텍스트, MessagePack은 바이트
+            message = await receive_message(websocket)
+            conn.last_seen = time.monotonic()                      # 유휴 시간 계산용 (heartbeat.py)
+            started = time.perf_counter()                          # 처리 시간 측정 시작
+            # 스트리밍 모드의 바이너리 프레임은 데이터 조각, 그 외에는 코덱으로 해석할 메시지
+            chunk = message.get("bytes") if stream is not None else None
+            data = chunk if chunk is not None else message_codec.frame_of(message)
+            
+            # 크기/속도 제한 검사 - 거절되면 메시지를 해석하지 않고 미리 인코딩된 응답만 보냄
+            rejected = limiter.check(len(data), chunk=chunk is not None)
+            if rejected is not None:
+                conn.send(rejection_frame(codec, rejected))
+                MESSAGES.inc(rejected)
+                RECEIVED_BYTES.inc(rejected, len(data))
+                log.warning("ws_message_rejected", sampled=True, connection_id=conn.id, reason=rejected,
+                            size=len(data))
+                if limiter.exhausted:
+                    # 제한을 계속 어기는 클라이언트는 연결 종료
+                    log.warning("ws_policy_close", connection_id=conn.id, reason=rejected)
+                    closing = conn.close(POLICY_VIOLATION_CLOSE_CODE, rejected)
+                    if closing is not None:
+                        await closing                             # 종료 프레임 전송이 끝날 때까지 대기
+                    break
+                continue
+            
+            if chunk is not None:
+                # 스트리밍 데이터 조각 - 링 버퍼에 넣고 윈도우가 찰 때마다 분석 요청
+                # (분석 프로세스가 모두 바쁘면 여기서 기다리므로 클라이언트에게 배압이 걸림)
+                if await stream.feed(chunk):
+                    outcome = "chunk"
+                else:
+                    outcome = "too_large"
+                    conn.send(rejection_frame(codec, outcome))
+                MESSAGES.inc(outcome)
+                RECEIVED_BYTES.inc(outcome, len(chunk))
+                continue
             
             try:
-                # 5단계: 받은 메시지가 JSON 형식인지 확인하고 파싱
-                message_data = json.loads(data)                    # JSON 문자열을 파이썬 딕셔너리로 변환
-                client_message = message_data.get("message", "")   # "message" 키의 값을 추출
-                
-                # 6단계: 에코 응답 생성 및 전송
-                response = {
-                    "echo": client_message,                        # 받은 메시지를 그대로 돌려보냄
-                    "timestamp": datetime.now().isoformat()       # 응답 시간 추가
-                }
-                await websocket.send_text(json.dumps(response))
-                print(f"에코 응답: {client_message}")
-                
-            except json.JSONDecodeError:
-                # JSON 파싱에 실패한 경우 (일반 텍스트로 보낸 경우)
+                # 5단계: 받은 메시지를 코덱 형식으로 해석 (파이썬 딕셔너리로 변환)
+                message_data = message_codec.decode(data)
+                # 6단계: "type" 값에 맞는 핸들러가 형식을 검사하고 응답을 만듦 (router.py)
+                outcome, response = await router.dispatch(ctx, message_data)
+            
+            except DecodeError:
+                # 형식 해석에 실패한 경우 (예: JSON이 아닌 일반 텍스트로 보낸 경우)
+                outcome = "non_json"
                 response = {
-                    "echo": data,                                  # 원본 텍스트 그대로 에코
-                    "timestamp": datetime.now().isoformat(),
+                    "echo": data,                                  # 원본 데이터 그대로 에코
+                    "timestamp": codec.timestamp(),
                     "note": "JSON 형식이 아닌 메시지입니다"           # 클라이언트에게 알림
                 }
-                await websocket.send_text(json.dumps(response))
-                print(f"일반 텍스트 에코: {data}")
             
             except Exception as e:
-                # 예상치 못한 에러가 발생한 경우
-                error_response = {
-                    "error": f"메시지 처리 중 오류: {str(e)}",
-                    "timestamp": datetime.now().isoformat()
-                }
-                await websocket.send_text(json.dumps(error_response))
-                print(f"메시지 처리 오류: {str(e)}")
+                # 예상치 못한 에러가 발생한 경우 - 클라이언트에게는 에러 내용 없이 고정된 응답만 보냄
+                # (로그에는 메시지 내용 대신 에러 종류만 기록)
+                outcome = "error"
+                response = error_message(ctx, "internal_error", "서버 내부 오류가 발생했습니다")
+                log.warning("ws_message_error", connection_id=conn.id, error=type(e).__name__)
+            
+            # 7단계: 응답 전송 (송신 큐에 넣기) 및 성능 지표 기록
+            if response is not None:
+                frame = codec.encode(response)
+                conn.send(frame)
+                SENT_BYTES.inc(outcome, len(frame))
+            elapsed = time.perf_counter() - started
+            MESSAGES.inc(outcome)
+            RECEIVED_BYTES.inc(outcome, len(data))
+            HANDLING_SECONDS.observe(elapsed, outcome)
+            log.debug("ws_message", sampled=True, connection_id=conn.id, outcome=outcome,
+                      size=len(data), seconds=round(elapsed, 6))
                 
     except WebSocketDisconnect:
         # 클라이언트가 연결을 끊었을 때 처리
-        active_connections.remove(websocket)
-        print(f"클라이언트 연결 해제. 남은 연결: {len(active_connections)}")
+        pass
+    finally:
+        # 어떤 이유로 루프가 끝나든 반드시 등록 해제 (연결 누수 방지)
+        manager.unregister(conn)
+        log.info("ws_disconnected", connection_id=conn.id, connections=manager.total_connections())
 
 @app.get("/health")
 async def health_check():
@@ -138,10 +331,24 @@ async def health_check():
     """
     return {
         "status": "healthy",                               # 서버 상태
-        "active_connections": len(active_connections),     # 현재 활성 WebSocket 연결 수
+        "active_connections": manager.total_connections(), # 현재 활성 WebSocket 연결 수 (모든 워커 합계)
         "timestamp": datetime.now().isoformat()           # 현재 시간
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    성능 지표 엔드포인트 (GET /metrics)
+    
+    용도: Prometheus 같은 모니터링 도구가 주기적으로 수집
+    응답: Prometheus 텍스트 형식
+    - ws_messages_total, ws_received_bytes_total, ws_sent_bytes_total: 처리 결과별 메시지 수/크기
+    - ws_message_handling_seconds: 메시지 처리 시간 분포
+    - ws_send_queue_depth_max, ws_send_queue_depth_total: 연결별 송신 큐 길이
+    - event_loop_lag_seconds: 이벤트 루프 지연 시간 분포
+    """
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # 이 파일이 직접 실행될 때만 서버 시작 (python main.py로 실행할 때)
 # 다른 파일에서 import할 때는 실행되지 않음
 if __name__ == "__main__":
@@ -154,11 +361,29 @@ if __name__ == "__main__":
     - port: 서버 포트 번호
     - reload: 코드 변경 시 자동 재시작 (개발 시에만 사용)
     - log_level: 로그 출력 레벨
+    - workers: 워커 프로세스 수 (2 이상이면 프로덕션 모드, reload 사용 불가)
     """
-    uvicorn.run(
-        "main:app",                # 실행할 FastAPI 앱
-        host=config.HOST,          # 서버 호스트 (config.py에서 설정)
-        port=config.PORT,          # 서버 포트 (config.py에서 설정)
-        reload=config.RELOAD,      # 자동 재시작 여부 (config.py에서 설정)
-        log_level=config.LOG_LEVEL # 로그 레벨 (config.py에서 설정)
-    ) 
\ No newline at end of file
+    if config.WORKERS > 1:
+        # 프로덕션 모드: 워커들을 연결할 허브를 먼저 띄우고 여러 워커로 실행
+        hub = multiprocessing.Process(target=run_hub, args=(config.BUS_SOCKET_PATH,), daemon=True)
+        hub.start()
+        try:
+            uvicorn.run(
+                "main:app",
+                host=config.HOST,
+                port=config.PORT,
+                workers=config.WORKERS,     # 워커 프로세스 수 (config.py에서 설정)
+                ws_max_size=config.WS_MAX_SIZE,
+                log_level=config.LOG_LEVEL
+            )
+        finally:
+            hub.terminate()
+    else:
+        uvicorn.run(
+            "main:app",                # 실행할 FastAPI 앱
+            host=config.HOST,          # 서버 호스트 (config.py에서 설정)
+            port=config.PORT,          # 서버 포트 (config.py에서 설정)
+            reload=config.RELOAD,      # 자동 재시작 여부 (config.py에서 설정)
+            ws_max_size=config.WS_MAX_SIZE,  # 이보다 큰 WebSocket 메시지는 연결 종료 (config.py에서 설정)
+            log_level=config.LOG_LEVEL # 로그 레벨 (config.py에서 설정)
+        )
@@ -0,0 +1,195 @@
+"""
+서버 성능 지표(메트릭) 수집
+
+/metrics 엔드포인트에서 Prometheus 텍스트 형식으로 내보냅니다.
+외부 라이브러리 없이 필요한 만큼만 구현했습니다:
+- Counter: 계속 증가하는 값 (예: 처리한 메시지 수)
+- Histogram: 값의 분포 (예: 메시지 처리 시간)
+- Gauge: 현재 값 (예: 연결 수) - 조회할 때 함수를 호출해서 계산
+
+라벨은 하나만 지원합니다 (예: outcome="echo").
+멀티 워커 모드에서는 요청을 처리한 워커 프로세스의 값만 보입니다.
+"""
+
+import asyncio
+import bisect
+import time
+
+# 메시지 처리 시간 히스토그램 구간 (초) - 10µs ~ 1초
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 1.0)
+
+# 이벤트 루프 지연 히스토그램 구간 (초) - 1ms ~ 5초
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _format_value(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Counter:
+    """계속 증가하는 값"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label: str = None):
+        self.name = name
+        self.help = help_text
+        self.label = label
+        self.values = {}                     # 라벨 값 → 누적 값
+
+    def inc(self, label_value: str = None, amount=1):
+        self.values[label_value] = self.values.get(label_value, 0) + amount
+
+    def render(self) -> list:
+        return [
+            f"{self.name}{_format_labels({self.label: key} if self.label else {})} {_format_value(value)}"
+            for key, value in self.values.items()
+        ]
+
+
+class Histogram:
+    """값의 분포를 정해진 구간(bucket)별 개수로 기록"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, label: str = None):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.label = label
+        self.values = {}                     # 라벨 값 → [구간별 개수 리스트, 합계, 개수]
+
+    def observe(self, value: float, label_value: str = None):
+        entry = self.values.get(label_value)
+        if entry is None:
+            entry = self.values[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self) -> list:
+        lines = []
+        for key, (counts, total, count) in self.values.items():
+            labels = {self.label: key} if self.label else {}
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': repr(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Gauge:
+    """현재 값 - 조회할 때마다 func()를 호출해서 계산"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, func):
+        self.name = name
+        self.help = help_text
+        self.func = func
+
+    def render(self) -> list:
+        return [f"{self.name} {_format_value(self.func())}"]
+
+
+class Registry:
+    """메트릭 모음 - render()로 Prometheus 텍스트 형식 출력"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        """메트릭 등록 (같은 이름이 이미 있으면 교체 - python main.py로 실행하면 main 모듈이 두 번 로드되므로)"""
+        self.metrics = [existing for existing in self.metrics if existing.name != metric.name]
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# ============== 서버 메트릭 ==============
+
+REGISTRY = Registry()
+
+# 메시지 처리 결과(outcome)별 지표
+# outcome: "echo"(정상 에코), "non_json"(JSON이 아닌 메시지), "error"(처리 오류), "broadcast"(방 브로드캐스트),
+#          "pong"(하트비트 응답), "too_large"/"rate_limited"(제한 초과로 거절),
+#          "chunk"(스트리밍 데이터 조각), "stream_end"(스트리밍 종료), "invalid"(형식이 틀린 메시지),
+#          그 밖에 router.py에 등록된 메시지 종류 이름
+MESSAGES = REGISTRY.register(Counter(
+    "ws_messages_total", "처리한 WebSocket 메시지 수", label="outcome"))
+RECEIVED_BYTES = REGISTRY.register(Counter(
+    "ws_received_bytes_total", "받은 메시지 크기 합계 (텍스트 프레임은 문자 수)", label="outcome"))
+SENT_BYTES = REGISTRY.register(Counter(
+    "ws_sent_bytes_total", "응답 메시지 크기 합계 (텍스트 프레임은 문자 수)", label="outcome"))
+HANDLING_SECONDS = REGISTRY.register(Histogram(
+    "ws_message_handling_seconds", "메시지 수신부터 응답을 송신 큐에 넣기까지 걸린 시간", LATENCY_BUCKETS, label="outcome"))
+
+# 하트비트에 응답하지 않아 정리된 유휴 연결 수
+REAPED = REGISTRY.register(Counter(
+    "ws_reaped_total", "유휴 시간 초과로 끊은 WebSocket 연결 수"))
+
+# 세션 (sessions.py) - outcome: "new"(새 세션), "resumed"(이전 세션 이어받기)
+SESSIONS_OPENED = REGISTRY.register(Counter(
+    "ws_sessions_opened_total", "연결에 붙인 세션 수", label="outcome"))
+
+# 스트리밍 분석 (ingest.py)
+INGEST_WINDOWS = REGISTRY.register(Counter(
+    "ingest_windows_total", "분석을 마친 스트리밍 윈도우 수", label="outcome"))
+INGEST_SECONDS = REGISTRY.register(Histogram(
+    "ingest_window_seconds", "윈도우 하나의 분석 요청부터 결과까지 걸린 시간 (대기 시간 포함)", LOOP_LAG_BUCKETS))
+
+# 이벤트 루프 지연 (기준 시간보다 얼마나 늦게 깨어났는지)
+LOOP_LAG_SECONDS = REGISTRY.register(Histogram(
+    "event_loop_lag_seconds", "이벤트 루프 지연 시간", LOOP_LAG_BUCKETS))
+
+
+def register_connection_gauges(manager, event_logger=None):
+    """연결 관리자(와 로거)의 현재 상태를 조회하는 Gauge들을 등록"""
+    REGISTRY.register(Gauge(
+        "ws_connections", "이 프로세스의 WebSocket 연결 수", lambda: len(manager)))
+    REGISTRY.register(Gauge(
+        "ws_send_queue_depth_max", "연결별 송신 큐 길이 중 최댓값",
+        lambda: max((conn.queue.qsize() for conn in manager.connections.values()), default=0)))
+    REGISTRY.register(Gauge(
+        "ws_send_queue_depth_total", "모든 연결의 송신 큐 길이 합계",
+        lambda: sum(conn.queue.qsize() for conn in manager.connections.values())))
+    REGISTRY.register(Gauge(
+        "ws_send_queue_dropped", "현재 연결들이 송신 큐가 가득 차서 버린 메시지 수 합계",
+        lambda: sum(conn.dropped for conn in manager.connections.values())))
+    if manager.sessions is not None:
+        REGISTRY.register(Gauge(
+            "ws_sessions", "보관 중인 세션 수 (연결이 끊긴 세션 포함)", lambda: len(manager.sessions)))
+        REGISTRY.register(Gauge(
+            "ws_replay_buffer_bytes", "세션들이 보관 중인 메시지 크기 합계", lambda: manager.sessions.used))
+    if event_logger is not None:
+        REGISTRY.register(Gauge(
+            "log_records_dropped", "로그 큐가 가득 차서 버린 로그 수", event_logger.dropped))
+
+
+async def monitor_loop_lag(interval: float = 0.5):
+    """
+    이벤트 루프 지연을 측정하는 태스크
+
+    interval초 동안 잠들었다가 실제로 깨어난 시각과의 차이를 기록
+    (다른 작업이 루프를 오래 붙잡고 있으면 차이가 커짐)
+    """
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        LOOP_LAG_SECONDS.observe(max(0.0, time.perf_counter() - started - interval))
@@ -0,0 +1,202 @@
+"""
+메시지 종류("type")별 처리 함수(핸들러) 라우터
+
+수신 루프(main.py의 websocket_endpoint)는 메시지를 해석한 뒤 router.dispatch()만 호출합니다.
+메시지 종류마다 pydantic 모델로 형식을 검사하고, 검사를 통과하면 해당 핸들러를 실행합니다.
+(pydantic 2의 검사기를 직접 사용하므로 pydantic 1.x에서는 동작하지 않음 - requirements.txt)
+
+특징:
+1. 라우팅은 "type" 값으로 딕셔너리를 한 번 찾는 것이 전부 (if/elif 분기 없음)
+2. 검사 함수는 서버 시작 시 한 번만 준비 (compile) - 메시지마다 모델을 찾거나 만들지 않음
+3. 형식이 틀린 메시지는 예외 문자열 대신 {"type": "error", "code": "invalid_message", ...}로 응답
+   ("type"이 문자열이 아닌 경우 포함)
+4. "type"이 없거나 등록되지 않은 메시지는 에코 핸들러가 처리 (기존 동작과 동일)
+5. 가장 흔한 에코 메시지는 모델 없이 딕셔너리를 그대로 읽음 ("message"는 어떤 값이든 되므로 검사할 것이 없음)
+
+핸들러 추가 예 (수신 루프는 수정할 필요 없음):
+    class SlideMessage(BaseModel):
+        page: int
+
+    @router.route("slide", SlideMessage)
+    def slide(ctx: MessageContext, message: SlideMessage):
+        return {"type": "slide_ack", "page": message.page, "timestamp": ctx.conn.codec.timestamp()}
+
+핸들러는 응답 메시지(딕셔너리) 또는 None(응답 없음)을 반환하고, async 함수여도 됩니다.
+모델 대신 None으로 등록하면 검사 없이 해석된 딕셔너리를 그대로 받습니다.
+요청이 잘못되었으면 MessageError를 발생시키면 에러 응답으로 바뀝니다.
+"""
+
+import inspect
+
+from pydantic import BaseModel, ValidationError
+
+
+class MessageError(Exception):
+    """핸들러가 요청을 처리할 수 없을 때 발생시키는 예외 (클라이언트에게 에러 응답으로 전달)"""
+
+    def __init__(self, code: str, error: str):
+        super().__init__(error)
+        self.code = code
+        self.error = error
+
+
+class MessageContext:
+    """핸들러에 전달되는 연결 정보 (연결마다 한 번 만들어서 재사용)"""
+
+    __slots__ = ("conn", "manager", "room", "stream")
+
+    def __init__(self, conn, manager, room: str = None, stream=None):
+        self.conn = conn                     # 메시지를 보낸 연결 (conn.codec으로 응답 형식 확인)
+        self.manager = manager               # 연결 관리자 (브로드캐스트 등)
+        self.room = room                     # 참여한 방 이름 (없으면 None)
+        self.stream = stream                 # 스트리밍 모드 세션 (ingest.py, 아니면 None)
+
+
+class Route:
+    """메시지 종류 하나의 검사 함수와 핸들러 (compile()이 만듦)"""
+
+    __slots__ = ("name", "validate", "handler", "is_async")
+
+    def __init__(self, name: str, model, handler):
+        self.name = name                     # 메시지 종류 ("type" 값), 지표의 outcome으로도 사용
+        # 모델 클래스에 미리 만들어진 pydantic 검사기를 직접 호출 (model_validate의 래퍼 비용 없음)
+        # 모델이 None이면 검사하지 않음
+        self.validate = model.__pydantic_validator__.validate_python if model is not None else None
+        self.handler = handler
+        self.is_async = inspect.iscoroutinefunction(handler)
+
+
+class MessageRouter:
+    """
+    "type" 값 → 핸들러 라우터
+
+    사용 예:
+        router.compile()                                   # 서버 시작 시 한 번
+        outcome, response = await router.dispatch(ctx, message_data)
+    """
+
+    def __init__(self, default: str = "echo"):
+        self.default = default               # "type"이 없거나 등록되지 않았을 때 사용할 메시지 종류
+        self.handlers = {}                   # 메시지 종류 → (모델, 핸들러)
+        self._routes = None                  # compile() 결과: 메시지 종류 → Route
+        self._default_route = None
+
+    def route(self, name: str, model):
+        """핸들러 등록 데코레이터 (서버 실행 중에 등록해도 바로 적용됨)"""
+        def decorator(handler):
+            self.handlers[name] = (model, handler)
+            if self._routes is not None:
+                self.compile()
+            return handler
+        return decorator
+
+    def compile(self):
+        """등록된 핸들러들의 라우팅 표와 검사 함수를 준비 (서버 시작 시 호출)"""
+        self._routes = {name: Route(name, model, handler) for name, (model, handler) in self.handlers.items()}
+        self._default_route = self._routes[self.default]
+
+    async def dispatch(self, ctx: MessageContext, data):
+        """
+        해석된 메시지 하나를 처리
+
+        반환값: (outcome, 응답 메시지 또는 None)
+        - outcome: 처리한 메시지 종류, 형식이 틀렸거나 처리할 수 없으면 "invalid"
+        """
+        if self._routes is None:
+            self.compile()
+        if type(data) is not dict:
+            return "invalid", error_message(ctx, "invalid_message", "Input should be an object")
+        kind = data.get("type")
+        if type(kind) is str:
+            route = self._routes.get(kind, self._default_route)
+        elif kind is None:
+            route = self._default_route
+        else:
+            # 리스트 등은 딕셔너리 키로 찾을 수도 없으므로 검사 단계 전에 거절
+            return "invalid", error_message(ctx, "invalid_message", "type: Input should be a valid string")
+        validate = route.validate
+        try:
+            response = route.handler(ctx, validate(data) if validate is not None else data)
+            if route.is_async:
+                response = await response
+        except ValidationError as e:
+            error = e.errors(include_url=False)[0]
+            location = ".".join(str(part) for part in error["loc"])
+            # 모델 클래스 이름이 들어가는 메시지("... or instance of XxxMessage")는 클라이언트에게 보이지 않게 바꿈
+            text = "Input should be an object" if error["type"] == "model_type" else error["msg"]
+            return "invalid", error_message(ctx, "invalid_message", f"{location}: {text}" if location else text)
+        except MessageError as e:
+            return "invalid", error_message(ctx, e.code, e.error)
+        return route.name, response
+
+
+def error_message(ctx: MessageContext, code: str, error: str) -> dict:
+    """에러 응답 메시지 (limits.py의 거절 응답과 같은 모양)"""
+    return {"type": "error", "code": code, "error": error, "timestamp": ctx.conn.codec.timestamp()}
+
+
+# 서버 전체에서 사용하는 라우터
+router = MessageRouter()
+
+
+# ============== 기본 메시지 종류 ==============
+
+class PongMessage(BaseModel):
+    """하트비트 응답 (heartbeat.py)"""
+
+
+class BroadcastMessage(BaseModel):
+    """같은 방의 다른 클라이언트들에게 보낼 메시지"""
+    message: str = ""
+
+
+class StreamEndMessage(BaseModel):
+    """스트리밍 종료 요청 (ingest.py)"""
+
+
+# 에코 요청 - "message" 값을 그대로 돌려보냄 (어떤 JSON 값이든 가능, 없으면 "")
+# 가장 흔한 메시지이고 검사할 필드가 없으므로 모델 없이 딕셔너리를 그대로 받음
+@router.route("echo", None)
+def echo(ctx: MessageContext, message: dict):
+    return {
+        "echo": message.get("message", ""),            # 받은 메시지를 그대로 돌려보냄
+        "timestamp": ctx.conn.codec.timestamp()        # 응답 시간 추가
+    }
+
+
+@router.route("pong", PongMessage)
+def pong(ctx: MessageContext, message: PongMessage):
+    # 마지막 수신 시각은 수신 루프가 이미 갱신했으므로 응답하지 않음
+    return None
+
+
+@router.route("broadcast", BroadcastMessage)
+def broadcast(ctx: MessageContext, message: BroadcastMessage):
+    if not ctx.room:
+        raise MessageError("not_in_room", "방에 참여한 연결만 브로드캐스트할 수 있습니다 (?room=방이름)")
+    # 같은 방의 다른 클라이언트들에게 전달 (코덱별로 한 번만 직렬화)
+    delivered = ctx.manager.broadcast(ctx.room, {
+        "type": "broadcast",
+        "room": ctx.room,
+        "message": message.message
+    }, exclude=ctx.conn)
+    return {
+        "type": "broadcast_ack",                       # 보낸 사람에게는 전달 결과만 알림
+        "delivered": delivered,                        # 메시지를 받은 클라이언트 수
+        "timestamp": ctx.conn.codec.timestamp()
+    }
+
+
+@router.route("stream_end", StreamEndMessage)
+async def stream_end(ctx: MessageContext, message: StreamEndMessage):
+    stream = ctx.stream
+    if stream is None:
+        raise MessageError("not_streaming", "스트리밍 모드(?mode=stream)에서만 사용할 수 있습니다")
+    # 윈도우보다 작게 남은 데이터까지 분석 요청
+    await stream.flush()
+    return {
+        "type": "stream_end_ack",
+        "windows": stream.windows,                     # 분석을 요청한 윈도우 수
+        "bytes": stream.offset,                        # 받은 데이터 전체 크기
+        "timestamp": ctx.conn.codec.timestamp()
+    }
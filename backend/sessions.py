@@ -0,0 +1,193 @@
+"""
+세션 이어받기 (재연결한 클라이언트에게 놓친 메시지 다시 보내기)
+
+네트워크가 불안정하면 연결이 끊기는 순간 보내던 메시지(송신 큐에 남은 것, 전송 중이던 것)가 사라집니다.
+이 모듈은 연결마다 세션을 만들어 보낸 메시지를 잠시 보관하고,
+같은 세션으로 다시 연결한 클라이언트에게 놓친 메시지만 다시 보냅니다.
+
+동작 방식:
+1. 연결하면 환영 메시지에 세션 토큰("session")이 들어 있음
+2. 서버가 보내는 모든 메시지에는 순번("seq", 1부터 1씩 증가)이 붙음 (환영 메시지, ping 제외)
+3. 다시 연결할 때 ws://.../ws?session=토큰&last_seq=마지막으로받은순번
+4. 세션이 남아 있으면 last_seq 이후의 메시지만 다시 보냄 (환영 메시지의 "resumed": true)
+
+보관 제한:
+- 연결이 끊긴 세션은 SESSION_TTL초 뒤에 삭제 (하트비트 태스크가 주기적으로 확인, heartbeat.py)
+- 세션마다 최근 SESSION_REPLAY_MESSAGES개까지만 보관
+- 모든 세션의 보관 메시지 크기 합계가 SESSION_MEMORY_BYTES를 넘으면
+  끊긴 지 오래된 세션부터 삭제 (그래도 넘으면 메시지를 기록하는 세션의 오래된 메시지부터 버림,
+  다른 세션과 공유하는 브로드캐스트 프레임은 버려도 메모리가 줄지 않으므로 그 앞에서 멈춤)
+- 메시지는 이미 인코딩된 프레임 그대로 보관하므로 다시 보낼 때 인코딩 비용이 없음
+  - 순번은 보낼 때 붙이므로 브로드캐스트 프레임은 여러 세션이 같은 프레임 하나를 공유하고 크기도 한 번만 계산
+
+세션을 이어받은 뒤에 이전 연결에서 늦게 보내진 메시지(처리 중이던 응답, 분석 결과 등)는
+순번을 받은 뒤 새 연결로 전달되므로 순번이 빠지지 않습니다 (connection_manager.py의 Connection.send).
+
+멀티 워커 모드에서는 세션을 만든 워커로 다시 연결된 경우에만 이어받을 수 있습니다.
+"""
+
+import secrets
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+
+# 같은 세션으로 새 연결이 들어와서 이전 연결을 끊을 때 사용하는 WebSocket 종료 코드 (4000번대: 애플리케이션 정의)
+SESSION_TAKEOVER_CLOSE_CODE = 4001
+
+
+class Session:
+    """
+    세션 하나: 순번 발급기 + 최근에 보낸 프레임 보관함
+
+    - conn: 현재 연결 (끊겨 있으면 None)
+    - frames: (순번, 순번을 붙이기 전 프레임) 목록 - 순번이 1씩 증가하므로 위치 계산만으로 찾을 수 있음
+    """
+
+    __slots__ = ("token", "codec", "seq", "frames", "conn", "expires", "store")
+
+    def __init__(self, token: str, codec, store: "SessionStore"):
+        self.token = token
+        self.codec = codec                   # 보관한 프레임의 형식 (다른 형식으로는 이어받을 수 없음)
+        self.seq = 0                         # 마지막으로 발급한 순번
+        self.frames = deque()                # (순번, 프레임)
+        self.conn = None
+        self.expires = 0.0                   # 연결이 끊긴 세션이 삭제될 시각 (time.monotonic)
+        self.store = store
+
+    def record(self, frame):
+        """프레임을 보관하고 다음 순번을 붙임 - 순번이 붙은 프레임을 반환"""
+        self.seq += 1
+        store = self.store
+        # store가 None이면 이미 삭제된 세션 (끊긴 연결로 늦게 도착한 메시지) - 순번만 붙이고 보관하지 않음
+        if store is not None:
+            self.frames.append((self.seq, frame))
+            store.retain(frame)
+            if len(self.frames) > store.max_messages:
+                self._pop_oldest()
+            if store.used > store.max_bytes:
+                store.evict(self)
+        return self.codec.stamp(frame, self.seq)
+
+    def missed(self, last_seq: int):
+        """
+        last_seq 이후에 보낸 프레임 목록
+
+        반환값: 프레임 리스트, 이미 버린 메시지가 포함되어 있거나 last_seq가 잘못되었으면 None
+        """
+        if last_seq < 0 or last_seq > self.seq:
+            return None
+        first = self.frames[0][0] if self.frames else self.seq + 1
+        if last_seq + 1 < first:
+            return None
+        stamp = self.codec.stamp
+        return [stamp(frame, seq) for seq, frame in islice(self.frames, last_seq + 1 - first, None)]
+
+    def _pop_oldest(self):
+        _, frame = self.frames.popleft()
+        self.store.release(frame)
+
+
+class SessionStore:
+    """
+    모든 세션 관리 (ConnectionManager가 하나 가지고 있음)
+
+    사용 예:
+        missed = store.open(conn, token, last_seq)   # 이어받았으면 다시 보낼 프레임 리스트, 새 세션이면 None
+        conn.send(frame)                             # conn.session이 순번을 붙이고 보관
+        store.detach(conn)                           # 연결이 끊기면 (ConnectionManager.unregister에서 호출)
+    """
+
+    def __init__(self, ttl: float, max_messages: int, max_bytes: int):
+        self.ttl = ttl                       # 연결이 끊긴 세션을 보관하는 시간 (초)
+        self.max_messages = max_messages     # 세션마다 보관하는 최대 메시지 수
+        self.max_bytes = max_bytes           # 모든 세션의 보관 메시지 크기 합계 한도
+        self.used = 0                        # 모든 세션의 보관 메시지 크기 합계 (공유 프레임은 한 번만)
+        self.refs = {}                       # id(프레임) → 그 프레임을 보관 중인 횟수
+        self.sessions = {}                   # 토큰 → Session
+        self.detached = OrderedDict()        # 연결이 끊긴 세션 (끊긴 순서 = 삭제될 순서)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def open(self, conn, token: str = None, last_seq: int = None):
+        """
+        연결에 세션을 붙임 - token의 세션을 이어받거나, 이어받을 수 없으면 새로 만듦
+
+        반환값: 이어받았으면 다시 보낼 프레임 리스트 (놓친 메시지가 없으면 빈 리스트), 새 세션이면 None
+        """
+        self.purge(time.monotonic())
+        session = self.sessions.get(token) if token else None
+        missed = None
+        if session is not None and last_seq is not None and session.codec is conn.codec:
+            missed = session.missed(last_seq)
+        if missed is None:
+            session = Session(secrets.token_urlsafe(16), conn.codec, self)
+            self.sessions[session.token] = session
+        self._attach(session, conn)
+        return missed
+
+    def detach(self, conn):
+        """연결이 끊긴 세션을 SESSION_TTL초 동안 보관 (여러 번 호출해도 안전)"""
+        session = conn.session
+        if session is None or session.conn is not conn:
+            return
+        now = time.monotonic()
+        session.conn = None
+        session.expires = now + self.ttl
+        self.detached[session.token] = session
+        self.purge(now)
+
+    def purge(self, now: float):
+        """보관 시간이 지난 세션 삭제 (끊긴 순서대로 들어 있으므로 앞에서부터 확인)"""
+        while self.detached:
+            session = next(iter(self.detached.values()))
+            if session.expires > now:
+                break
+            self._drop(session)
+
+    def retain(self, frame):
+        """보관할 프레임의 크기를 합계에 더함 (여러 세션이 공유하는 프레임은 처음 한 번만)"""
+        key = id(frame)
+        count = self.refs.get(key, 0)
+        if not count:
+            self.used += len(frame)
+        self.refs[key] = count + 1
+
+    def release(self, frame):
+        """보관하던 프레임을 버림 (마지막으로 보관하던 세션이 버릴 때 합계에서 뺌)"""
+        key = id(frame)
+        count = self.refs[key] - 1
+        if count:
+            self.refs[key] = count
+        else:
+            del self.refs[key]
+            self.used -= len(frame)
+
+    def evict(self, recording: Session):
+        """보관 메시지 크기 합계가 한도 아래로 내려갈 때까지 오래된 것부터 삭제"""
+        while self.used > self.max_bytes and self.detached:
+            self._drop(next(iter(self.detached.values())))
+        refs = self.refs
+        while self.used > self.max_bytes and len(recording.frames) > 1:
+            if refs[id(recording.frames[0][1])] > 1:
+                # 다른 세션도 보관 중인 브로드캐스트 프레임 - 버려도 메모리가 줄지 않으므로 기록은 그대로 둠
+                break
+            recording._pop_oldest()
+
+    def _attach(self, session: Session, conn):
+        self.detached.pop(session.token, None)
+        previous = session.conn
+        if previous is not None and previous is not conn:
+            # 이전 연결이 아직 살아 있으면 (반쯤 열린 연결 등) 새 연결에게 세션을 넘기고 끊음
+            # previous.session은 그대로 두어 이전 연결에서 늦게 보내진 메시지가 새 연결로 전달되게 함
+            previous.close(SESSION_TAKEOVER_CLOSE_CODE, "session resumed")
+        session.conn = conn
+        conn.session = session
+
+    def _drop(self, session: Session):
+        self.detached.pop(session.token, None)
+        self.sessions.pop(session.token, None)
+        for _, frame in session.frames:
+            self.release(frame)
+        session.frames.clear()
+        session.store = None
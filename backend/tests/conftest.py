@@ -0,0 +1,78 @@
+"""
+테스트 공통 설정
+
+backend 폴더의 모듈(main.py와 같은 위치)을 바로 import할 수 있도록 경로를 추가하고,
+여러 테스트 파일에서 함께 쓰는 가짜 객체들을 fixture로 제공합니다.
+
+실행 방법 (backend 폴더에서):
+    python -m pytest -q
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from wire import JSON_CODEC  # noqa: E402 (경로를 추가한 뒤에 import)
+
+
+class FakeWebSocket:
+    """보낸 프레임을 기록하는 가짜 WebSocket (ConnectionManager 테스트용)"""
+
+    def __init__(self):
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, data: str):
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.close_code = code
+
+
+class FakeConnection:
+    """코덱과 세션만 있는 가짜 연결 (라우터, SessionStore 테스트용)"""
+
+    def __init__(self, codec=JSON_CODEC):
+        self.codec = codec
+        self.session = None
+        self.close_code = None
+
+    def close(self, code: int = 1000, reason: str = None):
+        self.close_code = code
+
+
+class FakeClock:
+    """time.monotonic 대신 사용하는 직접 움직이는 시계"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_websocket():
+    """FakeWebSocket을 만드는 함수 (테스트 하나에서 여러 개 만들 수 있음)"""
+    return FakeWebSocket
+
+
+@pytest.fixture
+def fake_connection():
+    """FakeConnection을 만드는 함수"""
+    return FakeConnection
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """time.monotonic을 대신하는 시계 (clock.now를 직접 움직임)"""
+    fake = FakeClock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
@@ -0,0 +1,90 @@
+"""bus.py - 프레임 인코딩과 프로세스 내부 허브(LocalHub)로 연결한 워커들"""
+
+import asyncio
+import json
+
+import pytest
+
+from bus import LocalBus, LocalHub, _BusPeer, encode_frame, read_frame
+from connection_manager import ConnectionManager
+
+
+async def settle():
+    """call_soon으로 미뤄 둔 접속 현황 전송과 송신 태스크가 실행되도록 이벤트 루프를 몇 번 돌림"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_frame_round_trip():
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(encode_frame({"op": "publish", "room": "r", "message": {"text": "안녕"}}))
+        reader.feed_eof()
+        return await read_frame(reader)
+
+    assert asyncio.run(scenario()) == {"op": "publish", "room": "r", "message": {"text": "안녕"}}
+
+
+def test_bus_peer_requires_emit():
+    class IncompleteBus(_BusPeer):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBus("worker")
+
+
+def test_broadcast_reaches_other_manager(fake_websocket):
+    async def scenario():
+        hub = LocalHub()
+        manager_a = ConnectionManager(bus=LocalBus(hub))
+        manager_b = ConnectionManager(bus=LocalBus(hub))
+        await manager_a.start()
+        await manager_b.start()
+
+        sender_ws, listener_ws = fake_websocket(), fake_websocket()
+        sender = manager_a.register(sender_ws)
+        listener = manager_b.register(listener_ws)
+        manager_a.join(sender, "room")
+        manager_b.join(listener, "room")
+        await settle()
+
+        delivered = manager_a.broadcast("room", {"type": "broadcast", "message": "hi"}, exclude=sender)
+        await settle()
+        await manager_a.stop()
+        await manager_b.stop()
+        return delivered, sender_ws.sent, listener_ws.sent
+
+    delivered, sender_sent, listener_sent = asyncio.run(scenario())
+    assert delivered == 1                                   # 다른 워커의 참여자 1명
+    assert sender_sent == []
+    assert [json.loads(frame)["message"] for frame in listener_sent] == ["hi"]
+
+
+def test_presence_is_shared_and_cleared(fake_websocket):
+    async def scenario():
+        hub = LocalHub()
+        manager_a = ConnectionManager(bus=LocalBus(hub))
+        manager_b = ConnectionManager(bus=LocalBus(hub))
+        await manager_a.start()
+        await manager_b.start()
+
+        conns = [manager_a.register(fake_websocket()) for _ in range(2)]
+        manager_a.join(conns[0], "room")
+        manager_b.join(manager_b.register(fake_websocket()), "room")
+        await settle()
+        joined = (manager_b.total_connections(), manager_b.room_size("room"), manager_a.room_size("room"))
+
+        manager_a.unregister(conns[0])
+        await settle()
+        left = (manager_b.total_connections(), manager_b.room_size("room"))
+
+        await manager_a.stop()                               # 워커 종료 → "gone"
+        await settle()
+        gone = manager_b.total_connections()
+        await manager_b.stop()
+        return joined, left, gone
+
+    joined, left, gone = asyncio.run(scenario())
+    assert joined == (3, 2, 2)
+    assert left == (2, 1)
+    assert gone == 1
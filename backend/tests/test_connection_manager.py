@@ -0,0 +1,140 @@
+"""connection_manager.py - 송신 큐와 느린 클라이언트 정책, 등록 해제, 방, 브로드캐스트"""
+
+import asyncio
+import json
+
+import msgpack
+
+from connection_manager import SLOW_CONSUMER_CLOSE_CODE, ConnectionManager
+from wire import CODECS, JSON_CODEC
+
+
+async def settle():
+    """송신 태스크와 연결 종료 태스크가 실행되도록 이벤트 루프를 몇 번 돌림"""
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_drop_oldest_keeps_newest_frames(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, slow_consumer_policy="drop_oldest")
+        websocket = fake_websocket()
+        conn = manager.register(websocket)
+        results = [conn.send(f"{n}") for n in range(4)]     # 송신 태스크가 실행되기 전에 큐를 넘치게 함
+        await settle()
+        return results, conn.dropped, websocket.sent, websocket.close_code
+
+    results, dropped, sent, close_code = asyncio.run(scenario())
+    assert results == [True, True, True, True]
+    assert dropped == 2
+    assert sent == ["2", "3"]
+    assert close_code is None
+
+
+def test_disconnect_policy_closes_slow_consumer(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, slow_consumer_policy="disconnect")
+        websocket = fake_websocket()
+        conn = manager.register(websocket)
+        results = [conn.send(f"{n}") for n in range(4)]
+        await settle()
+        return results, conn.closed, websocket.sent, websocket.close_code
+
+    results, closed, sent, close_code = asyncio.run(scenario())
+    assert results == [True, True, False, False]            # 닫힌 뒤에는 큐에 넣지 않음
+    assert closed
+    assert sent == []                                       # 송신 태스크도 중단됨
+    assert close_code == SLOW_CONSUMER_CLOSE_CODE
+
+
+def test_unregister_is_idempotent_and_cleans_rooms(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager()
+        conn = manager.register(fake_websocket())
+        other = manager.register(fake_websocket())
+        manager.join(conn, "a")
+        manager.join(conn, "b")
+        manager.join(other, "b")
+        manager.unregister(conn)
+        manager.unregister(conn)                            # 두 번 호출해도 안전
+        await settle()
+        return manager, conn, other
+
+    manager, conn, other = asyncio.run(scenario())
+    assert len(manager) == 1
+    assert "a" not in manager.rooms                         # 빈 방은 삭제
+    assert manager.rooms["b"] == {other}
+    assert conn.rooms == set() and conn.closed
+    assert conn.send("late") is False
+
+
+def test_unregister_after_send_failure(fake_websocket):
+    class BrokenWebSocket(fake_websocket):
+        async def send_text(self, data: str):
+            raise ConnectionResetError
+
+    async def scenario():
+        manager = ConnectionManager()
+        conn = manager.register(BrokenWebSocket())
+        manager.join(conn, "room")
+        conn.send("hello")
+        await settle()                                      # 송신 태스크가 실패하고 연결을 닫힌 것으로 표시
+        closed = conn.closed
+        manager.unregister(conn)
+        return manager, closed
+
+    manager, closed = asyncio.run(scenario())
+    assert closed
+    assert len(manager) == 0 and manager.rooms == {}
+
+
+def test_leave_removes_empty_room(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager()
+        conn = manager.register(fake_websocket())
+        manager.join(conn, "room")
+        size = manager.room_size("room")
+        manager.leave(conn, "room")
+        manager.leave(conn, "missing")                      # 참여하지 않은 방은 무시
+        return manager, conn, size
+
+    manager, conn, size = asyncio.run(scenario())
+    assert size == 1
+    assert manager.rooms == {} and conn.rooms == set()
+    assert manager.room_size("room") == 0
+
+
+def test_deliver_encodes_once_per_codec(fake_websocket, monkeypatch):
+    msgpack_codec = CODECS["pa.msgpack.v1"]
+    calls = []
+
+    def counting(codec):
+        """인코딩할 때마다 코덱 이름을 기록하는 encode"""
+        encode = codec.encode
+
+        def wrapper(message):
+            calls.append(codec.name)
+            return encode(message)
+        return wrapper
+
+    for codec in (JSON_CODEC, msgpack_codec):
+        monkeypatch.setattr(codec, "encode", counting(codec))
+
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = [fake_websocket() for _ in range(4)]
+        codecs = [JSON_CODEC, JSON_CODEC, msgpack_codec, msgpack_codec]
+        conns = [manager.register(ws, codec) for ws, codec in zip(sockets, codecs)]
+        for conn in conns:
+            manager.join(conn, "room")
+        delivered = manager.deliver("room", {"type": "broadcast", "message": "hi"}, exclude=conns[0])
+        await settle()
+        return delivered, sockets
+
+    delivered, sockets = asyncio.run(scenario())
+    assert delivered == 3
+    assert sorted(calls) == ["json", "msgpack"]             # 연결 수와 관계없이 코덱마다 한 번
+    assert sockets[0].sent == []                            # 보낸 사람은 제외
+    assert sockets[2].sent[0] is sockets[3].sent[0]         # 같은 코덱이면 같은 프레임 객체를 공유
+    assert json.loads(sockets[1].sent[0])["message"] == "hi"
+    assert msgpack.unpackb(sockets[2].sent[0])["message"] == "hi"
@@ -0,0 +1,59 @@
+"""heartbeat.py - 타이머 휠과 ping/유휴 연결 정리"""
+
+import asyncio
+import json
+
+from connection_manager import ConnectionManager
+from heartbeat import IDLE_CLOSE_CODE, TimerWheel
+
+
+def test_wheel_expires_after_delay():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 2.0)
+    wheel.schedule("b", 3.0)
+    assert wheel.advance() == set()
+    assert wheel.advance() == {"a"}
+    assert wheel.advance() == {"b"}
+    assert len(wheel) == 0
+
+
+def test_wheel_reschedule_and_cancel():
+    wheel = TimerWheel(tick=1.0, slots=8)
+    wheel.schedule("a", 1.0)
+    wheel.schedule("a", 3.0)                                # 다시 예약하면 이전 예약은 없어짐
+    wheel.schedule("b", 1.0)
+    wheel.cancel("b")
+    wheel.cancel("missing")                                 # 예약되지 않은 항목은 무시
+    assert [wheel.advance() for _ in range(3)] == [set(), set(), {"a"}]
+
+
+def test_wheel_clamps_long_delay():
+    wheel = TimerWheel(tick=1.0, slots=4)
+    wheel.schedule("a", 100.0)                              # 휠 한 바퀴보다 길면 마지막 칸에 들어감
+    assert [wheel.advance() for _ in range(3)] == [set(), set(), {"a"}]
+
+
+def test_ping_then_reap(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager(heartbeat_interval=10, idle_timeout=30)
+        websocket = fake_websocket()
+        conn = manager.register(websocket)
+        heartbeat = manager.heartbeat
+
+        heartbeat._check(conn, conn.last_seen + 5)          # 아직 조용한 시간이 짧음
+        await asyncio.sleep(0)
+        quiet = list(websocket.sent)
+
+        heartbeat._check(conn, conn.last_seen + 12)         # interval 지남 → ping
+        await asyncio.sleep(0)
+        pinged = list(websocket.sent)
+
+        heartbeat._check(conn, conn.last_seen + 31)         # idle_timeout 지남 → 연결 종료
+        await asyncio.sleep(0)
+        return quiet, pinged, websocket.close_code, len(manager)
+
+    quiet, pinged, close_code, remaining = asyncio.run(scenario())
+    assert quiet == []
+    assert [json.loads(frame) for frame in pinged] == [{"type": "ping"}]
+    assert close_code == IDLE_CLOSE_CODE
+    assert remaining == 0
@@ -0,0 +1,72 @@
+"""ingest.py - 링 버퍼, 분석 단계 / limits.py - 스트리밍 데이터 조각의 바이트 속도 제한"""
+
+import struct
+
+import pytest
+
+from ingest import IngestPipeline, RingBuffer, audio_level, text_stats
+from limits import FrameLimiter
+
+
+def test_ring_buffer_wraparound():
+    ring = RingBuffer(8)
+    assert ring.write(b"abcdef")
+    assert ring.read(4) == b"abcd"
+    assert ring.write(b"ghijkl")                            # 끝에서 처음으로 이어서 씀
+    assert ring.size == 8 and ring.free() == 0
+    assert not ring.write(b"m")                             # 공간이 없으면 쓰지 않음
+    assert ring.read(8) == b"efghijkl"                      # 이어진 부분도 순서대로 읽힘
+    assert ring.size == 0
+
+
+def test_ring_buffer_read_more_than_stored():
+    ring = RingBuffer(4)
+    ring.write(b"ab")
+    assert ring.read(10) == b"ab"
+    assert ring.read(1) == b""
+
+
+def test_ring_buffer_rejects_non_positive_read():
+    ring = RingBuffer(8)
+    ring.write(b"abcd")
+    for n in (0, -3):
+        with pytest.raises(ValueError):
+            ring.read(n)
+    assert ring.size == 4
+
+
+def test_session_rejects_non_positive_window(fake_connection):
+    pipeline = IngestPipeline(processes=1, max_inflight=1)
+    for window in (0, -1):
+        with pytest.raises(ValueError):
+            pipeline.session(fake_connection(), ["audio_level"], window, 1024)
+
+
+def test_audio_level():
+    data = struct.pack("<4h", 0, 16384, -32768, 16384)
+    result = audio_level(data + b"\x01")                    # 홀수 바이트는 무시
+    assert result["samples"] == 4
+    assert result["peak"] == 1.0
+    assert audio_level(b"") == {"rms": 0.0, "peak": 0.0, "samples": 0}
+
+
+def test_text_stats():
+    result = text_stats("안녕하세요. 발표를 시작합니다!".encode())
+    assert result["words"] == 3
+    assert result["sentences"] == 2
+
+
+def test_chunks_use_byte_budget(clock):
+    limiter = FrameLimiter(max_frame_bytes=100, rate=1, burst=1, max_strikes=3, byte_rate=1000, byte_burst=200)
+    # 메시지 개수 제한(1개)과 관계없이 바이트 예산 안에서는 작은 조각을 여러 개 보낼 수 있음
+    assert [limiter.check(50, chunk=True) for _ in range(5)] == [None, None, None, None, "rate_limited"]
+    clock.now += 0.06                                       # 초당 1000바이트 → 0.06초에 60바이트
+    assert limiter.check(50, chunk=True) is None
+    assert limiter.check(101, chunk=True) == "too_large"
+    assert limiter.check(1) is None                         # 메시지 버킷은 그대로
+
+
+def test_byte_budget_disabled():
+    limiter = FrameLimiter(max_frame_bytes=100, rate=1, burst=1, max_strikes=3)
+    assert limiter.byte_bucket is None
+    assert all(limiter.check(100, chunk=True) is None for _ in range(100))
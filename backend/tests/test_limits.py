@@ -0,0 +1,48 @@
+"""limits.py - 메시지 크기 제한, 토큰 버킷 속도 제한, 연속 거절 횟수"""
+
+from limits import FrameLimiter, rejection_frame
+from wire import JSON_CODEC
+
+
+def make_limiter(**kwargs) -> FrameLimiter:
+    options = {"max_frame_bytes": 100, "rate": 10, "burst": 3, "max_strikes": 3}
+    options.update(kwargs)
+    return FrameLimiter(**options)
+
+
+def test_too_large(clock):
+    limiter = make_limiter()
+    assert limiter.check(100) is None
+    assert limiter.check(101) == "too_large"
+
+
+def test_burst_then_refill(clock):
+    limiter = make_limiter()
+    assert [limiter.check(1) for _ in range(4)] == [None, None, None, "rate_limited"]
+    clock.now += 0.1                                        # 초당 10개 → 0.1초에 1개 채워짐
+    assert limiter.check(1) is None
+    assert limiter.check(1) == "rate_limited"
+
+
+def test_strikes_exhaust_and_reset(clock):
+    limiter = make_limiter()
+    limiter.check(101)
+    limiter.check(101)
+    assert not limiter.exhausted
+    limiter.check(1)                                        # 통과하면 연속 거절 횟수 초기화
+    assert limiter.strikes == 0
+    for _ in range(3):
+        limiter.check(101)
+    assert limiter.exhausted
+
+
+def test_rate_zero_disables_rate_limit(clock):
+    limiter = make_limiter(rate=0)
+    assert all(limiter.check(1) is None for _ in range(1000))
+    assert limiter.check(101) == "too_large"
+
+
+def test_rejection_frame_is_cached():
+    frame = rejection_frame(JSON_CODEC, "rate_limited")
+    assert frame is rejection_frame(JSON_CODEC, "rate_limited")
+    assert '"code": "rate_limited"' in frame
@@ -0,0 +1,93 @@
+"""metrics.py - Prometheus 텍스트 형식 출력 / logging_setup.py - 로그 큐와 샘플링"""
+
+import logging
+import queue
+
+from logging_setup import DroppingQueueHandler, EventLogger, JsonFormatter
+from metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_counter_render():
+    counter = Counter("requests_total", "요청 수", label="outcome")
+    counter.inc("echo")
+    counter.inc("echo", 2)
+    counter.inc("error", 0.5)
+    assert counter.render() == ['requests_total{outcome="echo"} 3', 'requests_total{outcome="error"} 0.5']
+
+
+def test_histogram_render_is_cumulative():
+    histogram = Histogram("latency_seconds", "처리 시간", (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):                     # 구간 경계값(0.1)은 그 구간에 포함
+        histogram.observe(value)
+    assert histogram.render() == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 3.65',
+        'latency_seconds_count 4',
+    ]
+
+
+def test_histogram_render_with_label():
+    histogram = Histogram("latency_seconds", "처리 시간", (1.0,), label="outcome")
+    histogram.observe(2.0, "echo")
+    assert histogram.render() == [
+        'latency_seconds_bucket{outcome="echo",le="1.0"} 0',
+        'latency_seconds_bucket{outcome="echo",le="+Inf"} 1',
+        'latency_seconds_sum{outcome="echo"} 2.0',
+        'latency_seconds_count{outcome="echo"} 1',
+    ]
+
+
+def test_registry_render_and_replace():
+    registry = Registry()
+    registry.register(Gauge("connections", "연결 수", lambda: 1))
+    registry.register(Gauge("connections", "연결 수", lambda: 7))   # 같은 이름은 교체
+    assert registry.render() == "# HELP connections 연결 수\n# TYPE connections gauge\nconnections 7\n"
+
+
+def make_logger(name: str, sample_rate: float) -> tuple:
+    """출력 대신 큐에 레코드를 모으는 EventLogger"""
+    records = queue.Queue()
+    logger = logging.getLogger(f"test.{name}")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers[:] = [DroppingQueueHandler(records)]
+    return EventLogger(logger, sample_rate), records
+
+
+def test_dropping_handler_counts_drops():
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    logger = logging.getLogger("test.dropping")
+    logger.propagate = False
+    logger.handlers[:] = [handler]
+    event_logger = EventLogger(logger, sample_rate=1.0)
+    event_logger.handler = handler
+    for n in range(5):
+        event_logger.warning("event", n=n)                  # 기다리지 않고 넘치는 로그는 버림
+    assert log_queue.qsize() == 2
+    assert event_logger.dropped() == 3
+
+
+def test_sampled_logs_skipped_when_rate_is_zero():
+    event_logger, records = make_logger("sampling", sample_rate=0.0)
+    event_logger.debug("ws_message", sampled=True, outcome="echo")
+    assert records.empty()
+    event_logger.info("ws_connected", connection_id=1)      # 샘플링하지 않는 로그는 그대로 남음
+    assert records.qsize() == 1
+
+
+def test_disabled_level_is_skipped():
+    event_logger, records = make_logger("level", sample_rate=1.0)
+    event_logger.logger.setLevel(logging.INFO)
+    event_logger.debug("noisy")
+    assert records.empty()
+
+
+def test_json_formatter_includes_fields():
+    event_logger, records = make_logger("format", sample_rate=1.0)
+    event_logger.info("ws_connected", connection_id=3, room="발표")
+    line = JsonFormatter().format(records.get_nowait())
+    assert '"event": "ws_connected"' in line
+    assert '"connection_id": 3' in line and '"room": "발표"' in line
@@ -0,0 +1,74 @@
+"""router.py - 메시지 종류별 라우팅, 형식 검사, 에러 응답"""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from router import MessageContext, MessageRouter, router
+
+
+@pytest.fixture
+def dispatch(fake_connection):
+    """메시지 하나를 라우터로 처리하는 함수 - (outcome, 응답)을 반환"""
+    def run(data, room: str = None, stream=None) -> tuple:
+        ctx = MessageContext(fake_connection(), manager=None, room=room, stream=stream)
+        return asyncio.run(router.dispatch(ctx, data))
+    return run
+
+
+def test_echo_is_default(dispatch):
+    for data in ({"message": "안녕"}, {"type": "slide", "message": "안녕"}):
+        outcome, response = dispatch(data)
+        assert outcome == "echo"
+        assert response["echo"] == "안녕"
+    assert dispatch({})[1]["echo"] == ""                    # "message"가 없으면 빈 문자열
+    assert dispatch({"message": [1, {"a": None}]})[1]["echo"] == [1, {"a": None}]
+
+
+def test_pong_has_no_response(dispatch):
+    assert dispatch({"type": "pong"}) == ("pong", None)
+
+
+def test_invalid_fields(dispatch):
+    outcome, response = dispatch({"type": "broadcast", "message": {"text": "객체"}}, room="a")
+    assert outcome == "invalid"
+    assert response["code"] == "invalid_message"
+    assert response["error"].startswith("message:")
+
+
+def test_non_dict_is_invalid(dispatch):
+    for data in (["Hello", "World"], "Hello", 3, None):
+        outcome, response = dispatch(data)
+        assert outcome == "invalid"
+        assert response["code"] == "invalid_message"
+        assert response["error"] == "Input should be an object"
+
+
+def test_error_hides_model_names(fake_connection):
+    class Slide(BaseModel):
+        page: int
+
+    class SlideMessage(BaseModel):
+        slide: Slide
+
+    local = MessageRouter()
+    local.route("echo", None)(lambda ctx, message: None)
+    local.route("slide", SlideMessage)(lambda ctx, message: None)
+    ctx = MessageContext(fake_connection(), manager=None)
+    outcome, response = asyncio.run(local.dispatch(ctx, {"type": "slide", "slide": "첫 장"}))
+    assert outcome == "invalid"
+    assert response["error"] == "slide: Input should be an object"   # "instance of Slide" 대신
+
+
+def test_non_string_type_is_invalid(dispatch):
+    for kind in ([1], {"a": 1}, 3):                        # 리스트/딕셔너리는 딕셔너리 키로 찾을 수도 없음
+        outcome, response = dispatch({"type": kind})
+        assert outcome == "invalid"
+        assert response == {"type": "error", "code": "invalid_message",
+                            "error": "type: Input should be a valid string", "timestamp": response["timestamp"]}
+
+
+def test_handler_errors(dispatch):
+    assert dispatch({"type": "broadcast", "message": "x"})[1]["code"] == "not_in_room"
+    assert dispatch({"type": "stream_end"})[1]["code"] == "not_streaming"
@@ -0,0 +1,147 @@
+"""sessions.py - 놓친 메시지 다시 보내기, 보관 한도, 늦게 보내진 메시지 전달"""
+
+import asyncio
+import json
+
+from connection_manager import ConnectionManager
+from sessions import SESSION_TAKEOVER_CLOSE_CODE, SessionStore
+from wire import JSON_CODEC
+
+
+def seqs(frames) -> list:
+    return [json.loads(frame)["seq"] for frame in frames]
+
+
+def test_missed_returns_stamped_frames(fake_connection):
+    store = SessionStore(ttl=30, max_messages=3, max_bytes=1 << 20)
+    conn = fake_connection()
+    assert store.open(conn) is None                         # 새 세션
+    session = conn.session
+    for n in range(5):
+        session.record(JSON_CODEC.encode({"n": n}))
+    assert seqs(session.missed(3)) == [4, 5]
+    assert session.missed(5) == []
+    assert session.missed(1) is None                        # 최근 3개만 보관 (1, 2는 이미 버림)
+    assert session.missed(6) is None                        # 아직 보내지 않은 순번
+
+
+def test_resume_and_expire(fake_connection):
+    store = SessionStore(ttl=30, max_messages=10, max_bytes=1 << 20)
+    old = fake_connection()
+    store.open(old)
+    old.session.record(JSON_CODEC.encode({"n": 1}))
+    store.detach(old)
+
+    new = fake_connection()
+    assert store.open(new, old.session.token, last_seq=0) is not None
+    assert new.session is old.session
+    store.detach(new)
+
+    store.purge(new.session.expires)                        # 보관 시간이 지나면 삭제
+    assert len(store) == 0 and store.used == 0
+
+
+def test_evict_drops_detached_sessions_first(fake_connection):
+    frame = JSON_CODEC.encode({"message": "x" * 50})
+    store = SessionStore(ttl=30, max_messages=10, max_bytes=len(frame) * 3)
+    idle, active = fake_connection(), fake_connection()
+    store.open(idle)
+    store.open(active)
+    idle.session.record(JSON_CODEC.encode({"message": "x" * 50}))
+    store.detach(idle)
+    for _ in range(3):
+        active.session.record(JSON_CODEC.encode({"message": "x" * 50}))
+    assert idle.session.token not in store.sessions         # 끊긴 세션부터 삭제
+    assert store.used == len(frame) * 3
+    active.session.record(JSON_CODEC.encode({"message": "x" * 50}))
+    assert len(active.session.frames) == 3                  # 그래도 넘으면 기록 중인 세션의 오래된 메시지를 버림
+    assert store.used <= store.max_bytes
+
+
+def test_shared_frame_counted_once(fake_connection):
+    store = SessionStore(ttl=30, max_messages=10, max_bytes=1 << 20)
+    conns = [fake_connection() for _ in range(3)]
+    for conn in conns:
+        store.open(conn)
+    frame = JSON_CODEC.encode({"type": "broadcast", "message": "공유"})
+    stamped = [conn.session.record(frame) for conn in conns]  # 브로드캐스트: 같은 프레임을 여러 세션이 보관
+    assert store.used == len(frame)
+    assert [json.loads(s)["seq"] for s in stamped] == [1, 1, 1]
+    for conn in conns[:2]:
+        store.detach(conn)
+    store.purge(conns[1].session.expires)
+    assert len(store) == 1
+    assert store.used == len(frame)                         # 마지막 세션이 아직 보관 중
+    store.detach(conns[2])
+    store.purge(conns[2].session.expires)
+    assert store.used == 0 and store.refs == {}
+
+
+def test_evict_keeps_shared_frames(fake_connection):
+    frame = JSON_CODEC.encode({"type": "broadcast", "message": "x" * 50})
+    store = SessionStore(ttl=30, max_messages=10, max_bytes=len(frame) * 5)
+    conns = [fake_connection() for _ in range(3)]
+    for conn in conns:
+        store.open(conn)
+    for _ in range(6):                                      # 한도(5개)를 넘는 브로드캐스트
+        shared = JSON_CODEC.encode({"type": "broadcast", "message": "x" * 50})
+        for conn in conns:
+            conn.session.record(shared)
+    # 공유 프레임은 버려도 메모리가 줄지 않으므로 어느 세션의 기록도 잘라내지 않음
+    assert [len(conn.session.frames) for conn in conns] == [6, 6, 6]
+    assert store.used == len(frame) * 6
+
+    # 혼자 보관하는 프레임은 메모리가 실제로 줄어드는 만큼만 버림
+    conns[0].session.record(JSON_CODEC.encode({"message": "혼자"}))
+    assert [len(conn.session.frames) for conn in conns] == [7, 6, 6]
+
+
+def test_replay_keeps_seq_order(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager(session_ttl=30)
+        old_socket, new_socket = fake_websocket(), fake_websocket()
+        old = manager.register(old_socket)
+        manager.sessions.open(old)
+        for n in range(5):
+            old.send_message({"n": n})
+        await asyncio.sleep(0)
+
+        new = manager.register(new_socket)
+        manager.join(new, "room")
+        missed = manager.sessions.open(new, old.session.token, last_seq=0)
+        replaying = asyncio.create_task(new.replay(missed, limit=2))
+        await asyncio.sleep(0)                              # 송신 큐가 차서 다시 보내기가 기다리는 중
+        old.send_message({"n": "late"})                     # 이전 연결의 늦은 응답 (새 연결로 전달)
+        manager.deliver("room", {"type": "broadcast"})      # 방 브로드캐스트
+        await replaying
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return new_socket
+
+    new_socket = asyncio.run(scenario())
+    assert seqs(new_socket.sent) == [1, 2, 3, 4, 5, 6, 7]
+
+
+def test_late_send_is_forwarded_to_resumed_connection(fake_websocket):
+    async def scenario():
+        manager = ConnectionManager(session_ttl=30)
+        old_socket, new_socket = fake_websocket(), fake_websocket()
+        old = manager.register(old_socket)
+        manager.sessions.open(old)
+        old.send_message({"n": 1})
+        await asyncio.sleep(0)
+
+        # 이전 연결이 끊긴 것을 서버가 알기 전에 같은 세션으로 다시 연결
+        new = manager.register(new_socket)
+        missed = manager.sessions.open(new, old.session.token, last_seq=1)
+        old.send_message({"n": 2})                          # 이전 연결에서 늦게 보내진 응답
+        new.send_message({"n": 3})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return missed, old_socket, new_socket
+
+    missed, old_socket, new_socket = asyncio.run(scenario())
+    assert missed == []
+    assert old_socket.close_code == SESSION_TAKEOVER_CLOSE_CODE
+    assert seqs(old_socket.sent) == [1]
+    assert [json.loads(frame) for frame in new_socket.sent] == [{"n": 2, "seq": 2}, {"n": 3, "seq": 3}]
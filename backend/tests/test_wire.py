@@ -0,0 +1,96 @@
+"""wire.py - 코덱 선택, 인코딩/디코딩, 프레임 꺼내기, 순번 붙이기"""
+
+import asyncio
+from types import SimpleNamespace
+
+import msgpack
+import pytest
+from fastapi import WebSocketDisconnect
+
+from wire import CODECS, JSON_CODEC, DecodeError, MsgpackCodec, receive_message, select_codec
+
+MSGPACK_CODEC = CODECS["pa.msgpack.v1"]
+
+
+def handshake(*subprotocols) -> SimpleNamespace:
+    """select_codec에 넘길 WebSocket (scope만 있으면 됨)"""
+    return SimpleNamespace(scope={"subprotocols": list(subprotocols)})
+
+
+def test_select_codec_first_supported_wins():
+    assert select_codec(handshake("pa.msgpack.v1", "pa.json.v1")) == (MSGPACK_CODEC, "pa.msgpack.v1")
+    assert select_codec(handshake("graphql-ws", "pa.json.v1", "pa.msgpack.v1")) == (JSON_CODEC, "pa.json.v1")
+
+
+def test_select_codec_falls_back_to_json():
+    assert select_codec(handshake()) == (JSON_CODEC, None)
+    assert select_codec(handshake("graphql-ws")) == (JSON_CODEC, None)
+    assert select_codec(SimpleNamespace(scope={})) == (JSON_CODEC, None)
+
+
+@pytest.mark.parametrize("codec", [JSON_CODEC, MSGPACK_CODEC], ids=lambda codec: codec.name)
+def test_round_trip(codec):
+    message = {"type": "broadcast", "message": "안녕하세요", "count": 3, "items": [1, 2.5, None, True]}
+    frame = codec.encode(message)
+    assert isinstance(frame, str if codec is JSON_CODEC else bytes)
+    assert codec.decode(frame) == message
+
+
+def test_timestamps():
+    assert isinstance(JSON_CODEC.timestamp(), str)
+    assert isinstance(MSGPACK_CODEC.timestamp(), int)       # epoch 밀리초
+
+
+@pytest.mark.parametrize("codec, frame", [
+    (JSON_CODEC, "{not json"),
+    (JSON_CODEC, ""),
+    (MSGPACK_CODEC, b"\xc1"),                               # MessagePack에서 사용하지 않는 바이트
+    (MSGPACK_CODEC, b"\x92\x01"),                           # 배열 항목이 모자람
+], ids=["json-broken", "json-empty", "msgpack-unused", "msgpack-truncated"])
+def test_decode_error(codec, frame):
+    with pytest.raises(DecodeError):
+        codec.decode(frame)
+
+
+def test_frame_of_converts_between_text_and_binary():
+    assert JSON_CODEC.frame_of({"text": "안녕"}) == "안녕"
+    assert JSON_CODEC.frame_of({"bytes": "안녕".encode()}) == "안녕"
+    assert JSON_CODEC.frame_of({"bytes": b"\xff"}) == "\ufffd"   # 잘못된 UTF-8은 대체 문자로
+    assert MSGPACK_CODEC.frame_of({"bytes": b"\x80"}) == b"\x80"
+    assert MSGPACK_CODEC.frame_of({"text": "안녕"}) == "안녕".encode()
+    assert JSON_CODEC.frame_of({}) == "" and MSGPACK_CODEC.frame_of({}) == b""
+
+
+def test_receive_message():
+    class FakeReceiver:
+        def __init__(self, *messages):
+            self.messages = list(messages)
+
+        async def receive(self) -> dict:
+            return self.messages.pop(0)
+
+    async def scenario():
+        websocket = FakeReceiver({"type": "websocket.receive", "text": "hi"},
+                                 {"type": "websocket.disconnect", "code": 1001})
+        message = await receive_message(websocket)
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            await receive_message(websocket)
+        return message, disconnect.value.code
+
+    message, code = asyncio.run(scenario())
+    assert message["text"] == "hi"
+    assert code == 1001
+
+
+def test_json_stamp():
+    assert JSON_CODEC.stamp('{"a": 1}', 7) == '{"a": 1, "seq": 7}'
+    assert JSON_CODEC.stamp("{}", 1) == '{"seq": 1}'
+
+
+def test_msgpack_stamp_header_rollover():
+    codec = MsgpackCodec()
+    for count in (0, 14, 15, 0xffff):                       # fixmap → map16 → map32로 넘어가는 경계
+        message = {f"k{i}": i for i in range(count)}
+        stamped = codec.stamp(codec.encode(message), 42)
+        assert msgpack.unpackb(stamped) == {**message, "seq": 42}
+    assert codec.stamp(codec.encode([1, 2]), 1) == codec.encode([1, 2])  # 맵이 아니면 그대로
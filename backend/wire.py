@@ -0,0 +1,162 @@
+"""
+WebSocket 메시지 인코딩/디코딩 (와이어 코덱)
+
+클라이언트는 연결할 때 WebSocket 서브프로토콜로 메시지 형식을 고를 수 있습니다.
+
+지원하는 형식:
+1. JSON (기본값) - 텍스트 프레임, 시간은 ISO 문자열 ("2024-01-01T12:00:00.000000")
+   서브프로토콜: "pa.json.v1" 또는 서브프로토콜 없음
+2. MessagePack - 바이너리 프레임, 시간은 정수 epoch 밀리초 (1704078000000)
+   서브프로토콜: "pa.msgpack.v1" (msgpack 패키지가 설치된 경우에만 사용 가능)
+
+JavaScript 예시:
+    new WebSocket('ws://localhost:8000/ws', ['pa.msgpack.v1'])
+"""
+
+import json
+import time
+from datetime import datetime
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+try:
+    import msgpack
+except ImportError:  # msgpack이 없으면 JSON 형식만 지원
+    msgpack = None
+
+
+class DecodeError(ValueError):
+    """받은 프레임을 코덱 형식으로 해석할 수 없을 때 발생하는 예외"""
+
+
+class JsonCodec:
+    """JSON 텍스트 프레임 코덱 (기존 동작과 동일)"""
+
+    name = "json"
+    subprotocol = "pa.json.v1"
+
+    def encode(self, message: dict) -> str:
+        """메시지(딕셔너리)를 JSON 문자열로 변환"""
+        return json.dumps(message)
+
+    def decode(self, frame: str):
+        """JSON 문자열을 파이썬 객체로 변환 (실패하면 DecodeError)"""
+        try:
+            return json.loads(frame)
+        except json.JSONDecodeError as e:
+            raise DecodeError(str(e)) from None
+
+    def frame_of(self, message: dict) -> str:
+        """ASGI 수신 메시지에서 프레임 데이터를 꺼냄 (바이너리로 와도 텍스트로 변환)"""
+        text = message.get("text")
+        if text is not None:
+            return text
+        return (message.get("bytes") or b"").decode("utf-8", "replace")
+
+    def timestamp(self) -> str:
+        """현재 시간 (ISO 형식 문자열)"""
+        return datetime.now().isoformat()
+
+    def stamp(self, frame: str, seq: int) -> str:
+        """
+        인코딩된 메시지에 순번("seq")을 추가 (sessions.py)
+
+        다시 인코딩하지 않고 마지막 "}" 앞에 필드를 끼워 넣음
+        - 브로드캐스트처럼 한 번 인코딩한 프레임을 여러 연결이 공유해도 연결마다 다른 순번을 붙일 수 있음
+        """
+        if len(frame) > 2:
+            return f'{frame[:-1]}, "seq": {seq}}}'
+        return f'{{"seq": {seq}}}'
+
+
+class MsgpackCodec:
+    """MessagePack 바이너리 프레임 코덱 (JSON보다 작고 빠름)"""
+
+    name = "msgpack"
+    subprotocol = "pa.msgpack.v1"
+
+    def __init__(self):
+        # Packer를 재사용하면 메시지마다 객체를 새로 만들지 않아도 됨
+        self._packer = msgpack.Packer()
+        self._seq_key = self._packer.pack("seq")
+
+    def encode(self, message: dict) -> bytes:
+        """메시지(딕셔너리)를 MessagePack 바이트로 변환"""
+        return self._packer.pack(message)
+
+    def decode(self, frame: bytes):
+        """MessagePack 바이트를 파이썬 객체로 변환 (실패하면 DecodeError)"""
+        try:
+            return msgpack.unpackb(frame)
+        except Exception as e:
+            raise DecodeError(str(e)) from None
+
+    def frame_of(self, message: dict) -> bytes:
+        """ASGI 수신 메시지에서 프레임 데이터를 꺼냄 (텍스트로 와도 바이트로 변환)"""
+        data = message.get("bytes")
+        if data is not None:
+            return data
+        return (message.get("text") or "").encode("utf-8")
+
+    def timestamp(self) -> int:
+        """현재 시간 (정수 epoch 밀리초) - 문자열 포맷팅 비용이 없음"""
+        return time.time_ns() // 1_000_000
+
+    def stamp(self, frame: bytes, seq: int) -> bytes:
+        """
+        인코딩된 메시지에 순번("seq")을 추가 (sessions.py)
+
+        다시 인코딩하지 않고 맵(map) 헤더의 항목 수만 1 늘린 뒤 끝에 "seq" 항목을 붙임
+        """
+        head = frame[0]
+        if head & 0xf0 == 0x80:              # fixmap (항목 15개 이하)
+            count, body = head & 0x0f, frame[1:]
+        elif head == 0xde:                   # map16
+            count, body = int.from_bytes(frame[1:3], "big"), frame[3:]
+        elif head == 0xdf:                   # map32
+            count, body = int.from_bytes(frame[1:5], "big"), frame[5:]
+        else:                                # 맵이 아닌 메시지에는 붙일 수 없음
+            return frame
+        count += 1
+        if count < 16:
+            header = bytes((0x80 | count,))
+        elif count < 0x10000:
+            header = b"\xde" + count.to_bytes(2, "big")
+        else:
+            header = b"\xdf" + count.to_bytes(4, "big")
+        return header + body + self._seq_key + self._packer.pack(seq)
+
+
+# 기본 코덱 (서브프로토콜을 지정하지 않은 클라이언트용)
+JSON_CODEC = JsonCodec()
+
+# 서브프로토콜 이름 → 코덱
+CODECS = {JSON_CODEC.subprotocol: JSON_CODEC}
+if msgpack is not None:
+    CODECS[MsgpackCodec.subprotocol] = MsgpackCodec()
+
+
+def select_codec(websocket: WebSocket):
+    """
+    클라이언트가 요청한 서브프로토콜 중 서버가 지원하는 첫 번째 코덱을 선택
+
+    반환값: (코덱, 응답할 서브프로토콜 이름 또는 None)
+    """
+    for subprotocol in websocket.scope.get("subprotocols", ()):
+        codec = CODECS.get(subprotocol)
+        if codec is not None:
+            return codec, subprotocol
+    return JSON_CODEC, None
+
+
+async def receive_message(websocket: WebSocket) -> dict:
+    """
+    ASGI 수신 메시지 하나를 그대로 반환 ({"text": ...} 또는 {"bytes": ...})
+    프레임 데이터는 codec.frame_of(message)로 꺼냄
+
+    연결이 끊어지면 WebSocketDisconnect 예외 발생
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    return message